@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-import datetime
-import os
+from instruments import load_instrument
+from results_store import get_store, make_record
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
@@ -55,67 +54,10 @@ gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
 
 st.markdown("---")
 
-# ---------------- QUESTIONS (6 DOMAINS) ----------------
-sections = {
-    "Social Interaction & Responsiveness": [
-        "Maintains eye contact while talking",
-        "Responds to their name",
-        "Shows interest in other children",
-        "Participates in group play",
-        "Interacts socially at home",
-        "Interacts socially outside",
-        "Maintains friendships",
-        "Behaves appropriately in groups"
-    ],
-    "Communication & Language": [
-        "Understands simple instructions",
-        "Expresses emotions appropriately",
-        "Communicates needs",
-        "Uses gestures",
-        "Forms sentences",
-        "Uses language socially",
-        "Initiates conversation",
-        "Communicates with teachers"
-    ],
-    "Behaviour & Adaptability": [
-        "Follows routines easily",
-        "Adapts to change",
-        "Follows classroom rules",
-        "Participates in activities",
-        "Sits calmly when needed",
-        "Displays age-appropriate behaviour",
-        "Reacts normally to change",
-        "Seeks help when needed"
-    ],
-    "Sensory Response": [
-        "Reacts normally to noise",
-        "Reacts normally to touch",
-        "Reacts normally to light",
-        "Reacts normally to sensory input"
-    ],
-    "Cognitive & Learning Skills": [
-        "Performs age-appropriate learning",
-        "Understands others’ feelings",
-        "Shows empathy",
-        "Matches patterns",
-        "Copies actions",
-        "Explores environment normally",
-        "Expresses curiosity",
-        "Shows imaginative or pretend play"
-    ],
-    "Motor & Coordination": [
-        "Shows appropriate motor skills",
-        "Coordinates hand movements",
-        "Uses hand-eye coordination well",
-        "Engages in normal activities",
-        "Laughs or smiles appropriately",
-        "Responds when spoken to",
-        "Uses appropriate language",
-        "Plays normally with toys"
-    ]
-}
-
-options = ["Never","Rarely","Sometimes","Often"]
+# ---------------- QUESTIONS (6 DOMAINS, definitions/isaa50-domains.json) ----------------
+instrument = load_instrument("isaa50-domains")
+sections = instrument.section_dict()
+options = list(instrument.options)
 
 # ---------------- STATE ----------------
 if "answers" not in st.session_state:
@@ -155,14 +97,13 @@ st.markdown("---")
 
 # ---------------- REVERSED RISK SCORING ----------------
 # Often = LOW RISK
-score_map = {"Never":3,"Rarely":2,"Sometimes":1,"Often":0}
+score_map = instrument.score_map
 
 def compute_score():
     return sum(score_map[a] for a in st.session_state.answers.values())
 
 # ---------------- SUBMIT ----------------
 if st.button("✔ Submit & View Result", type="primary"):
-
     if "" in st.session_state.answers.values():
         st.error("Please answer all questions before submitting.")
     else:
@@ -183,21 +124,11 @@ if st.button("✔ Submit & View Result", type="primary"):
         st.info("This tool is for awareness only — not a clinical diagnosis.")
 
         # ------------- SAVE CSV -------------
-        df = pd.DataFrame([{
-            "Name": name,
-            "Age": age,
-            "Gender": gender,
-            "Risk Score": total,
-            "Risk %": risk_percent,
-            "Date": datetime.date.today()
-        }])
-
-        df.to_csv(
-            "screening_results.csv",
-            mode="a",
-            header=not os.path.exists("screening_results.csv"),
-            index=False
-        )
+        # one schema and one locked writer for every app (results_store.py)
+        answers = [st.session_state.answers[f"q{i}"] for i in range(1, total_questions + 1)]
+        result = instrument.questionnaire.score(answers)
+        get_store("screening_results.csv").append(
+            make_record(name, age, gender, result, instrument="isaa50-domains"), answers=answers)
 
         st.success(" Result saved securely")
         st.balloons()
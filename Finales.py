@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import os
+from instruments import load_instrument
+from results_store import get_store, make_record
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -34,81 +34,17 @@ age = st.number_input("Age", min_value=1, max_value=100)
 gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
 st.markdown("---")
 
-# ---------- OPTIONS & SCORING ----------
-options = ["Never","Rarely","Sometimes","Often"]
-score_map = {"Never":3, "Rarely":2, "Sometimes":1, "Often":0}
-
-# ---------- QUESTIONS & SECTIONS WITH EMOJIS ----------
-sections = {
-"🧩 Social Relationship & Responsiveness": [
-"Child maintains eye contact while talking",
-"Child responds to their name",
-"Child shows interest in other children",
-"Child participates in group play",
-"Child understands simple instructions",
-"Child expresses emotions appropriately",
-"Child can communicate needs",
-"Child shows imaginative play",
-"Child shares interests with others",
-"Child reacts normally to sensory input"
-],
-"🗣 Communication": [
-"Child can sit calmly when needed",
-"Child follows routines easily",
-"Child adapts to change",
-"Child reacts normally to noise",
-"Child reacts normally to touch",
-"Child reacts normally to light",
-"Child performs age-appropriate learning",
-"Child interacts socially",
-"Child responds when spoken to",
-"Child laughs and smiles appropriately"
-],
-"❤️ Emotional Responsiveness": [
-"Child uses gestures",
-"Child points to express interest",
-"Child copies actions",
-"Child engages in pretend play",
-"Child shows empathy",
-"Child understands others’ feelings",
-"Child uses appropriate language",
-"Child forms sentences",
-"Child uses language socially",
-"Child initiates conversation"
-],
-"🧠 Cognitive Component": [
-"Child reacts normally to change",
-"Child plays normally with toys",
-"Child engages in normal activities",
-"Child explores environment normally",
-"Child expresses curiosity",
-"Child shows appropriate motor skills"
-],
-"✋ Sensory & Motor Behaviours": [
-"Child coordinates hand movements",
-"Child uses eye-hand coordination well",
-"Child imitates actions",
-"Child matches patterns",
-"Child interacts socially at home",
-"Child interacts socially outside"
-],
-"👥 Behaviour Pattern": [
-"Child behaves appropriately in groups",
-"Child maintains friendships",
-"Child behaves appropriately in school",
-"Child communicates with teachers",
-"Child follows classroom rules",
-"Child participates in activities",
-"Child displays age-appropriate behaviour",
-"Child seeks help when needed"
-]
-}
+# ---------- OPTIONS, SCORING & SECTIONS (definitions/isaa50.json) ----------
+instrument = load_instrument("isaa50")
+options = list(instrument.options)
+score_map = instrument.score_map  # Often = low risk (0), Never = high risk (3)
+sections = instrument.section_dict(icons=True)
 
 # ---------- SESSION STATE ----------
 if "page" not in st.session_state:
     st.session_state.page = 0
 if "answers" not in st.session_state:
-    st.session_state.answers = [""]*50
+    st.session_state.answers = [""]*len(instrument.items)
 
 section_names = list(sections.keys())
 total_pages = len(section_names)
@@ -145,8 +81,10 @@ def compute_score():
 # ---------- SUBMIT ----------
 if st.session_state.page == total_pages-1:
     if st.button("✔ Submit & View Result"):
+        # pandas loads only once results are shown, not on first paint
+        import pandas as pd
         total_score = compute_score()
-        max_score = 50*3
+        max_score = instrument.questionnaire.max_score
         percent = round((total_score/max_score)*100,2)
 
         st.markdown("---")
@@ -163,15 +101,10 @@ if st.session_state.page == total_pages-1:
 
 
         # ---------- SAVE CSV ----------
-        df = pd.DataFrame({
-            "Name":[name],
-            "Age":[age],
-            "Gender":[gender],
-            "Score":[total_score],
-            "Risk %":[percent],
-            "Date":[datetime.date.today()]
-        })
-        df.to_csv("results.csv", mode="a", header=not os.path.exists("results.csv"), index=False)
+        # one schema and one locked writer for every app (results_store.py)
+        result = instrument.questionnaire.score(st.session_state.answers)
+        get_store("results.csv").append(make_record(name, age, gender, result, instrument="isaa50"),
+                                        answers=st.session_state.answers)
         st.success("📁 Result saved to CSV")
 
         # ---------- VISUAL RISK BAR ----------
@@ -0,0 +1,124 @@
+"""Score a CSV of the train.csv schema with the saved model, in chunks.
+
+    python batch_predict.py district_registry.csv -o registry_scored.csv
+
+Each row gets ``ASD Probability`` and ``Predicted`` columns appended, plus
+``Triage`` when the model carries calibration.py thresholds.  The file
+is read ``chunksize`` rows at a time and written as it goes, so its size is
+not limited by memory.  Files bigger than ``POOL_THRESHOLD_BYTES`` are scored
+on a process pool (each worker loads the model once), with a bounded number of
+chunks in flight and output kept in input order.  code.py uses
+:func:`predict_csv` for its batch-upload mode.
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from model_service import MODEL_PATH, load_model, triage
+
+POOL_THRESHOLD_BYTES = 20 * 1024 * 1024
+PROBA_COLUMN = "ASD Probability"
+CLASS_COLUMN = "Predicted"
+TRIAGE_COLUMN = "Triage"
+
+
+def score_frame(chunk, model_path=MODEL_PATH):
+    """Return ``chunk`` with probability and class columns appended."""
+    artifact = load_model(model_path)  # cached per process after the first call
+    if artifact is None:
+        raise FileNotFoundError(f"no trained model at {model_path!r}; train one first")
+    model = artifact["model"]
+    X = chunk[artifact["features"]]
+    out = chunk.copy()
+    if hasattr(model, "predict_proba"):
+        out[PROBA_COLUMN] = model.predict_proba(X)[:, 1].round(4)
+    else:
+        out[PROBA_COLUMN] = float("nan")
+    out[CLASS_COLUMN] = model.predict(X)
+    if "thresholds" in artifact:
+        out[TRIAGE_COLUMN] = triage(out[PROBA_COLUMN], artifact["thresholds"])
+    return out
+
+
+def _score_to_csv(chunk, model_path):
+    return score_frame(chunk, model_path).to_csv(index=False, header=False)
+
+
+def _warm_worker(model_path):
+    load_model(model_path)
+
+
+def predict_csv(source, out, chunksize=50_000, workers=None, model_path=MODEL_PATH):
+    """Stream ``source`` (path or file object) through the model into text stream ``out``.
+
+    ``workers=None`` picks a process pool only for large files.  Returns the
+    number of rows scored.
+    """
+    if workers is None:
+        size = os.path.getsize(source) if isinstance(source, (str, os.PathLike)) \
+            else getattr(source, "size", 0)
+        workers = (os.cpu_count() or 1) if size > POOL_THRESHOLD_BYTES else 1
+
+    chunks = pd.read_csv(source, chunksize=chunksize)
+    n = 0
+    header_written = False
+
+    def write(chunk_csv, columns):
+        nonlocal header_written
+        if not header_written:
+            out.write(pd.DataFrame(columns=columns).to_csv(index=False))
+            header_written = True
+        out.write(chunk_csv)
+
+    if workers == 1:
+        for chunk in chunks:
+            scored = score_frame(chunk, model_path)
+            write(scored.to_csv(index=False, header=False), scored.columns)
+            n += len(chunk)
+        return n
+
+    artifact = load_model(model_path) or {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker,
+                             initargs=(model_path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            columns = list(chunk.columns) + [PROBA_COLUMN, CLASS_COLUMN]
+            if "thresholds" in artifact:
+                columns.append(TRIAGE_COLUMN)
+            pending.append((len(chunk), columns, pool.submit(_score_to_csv, chunk, model_path)))
+            if len(pending) >= 2 * workers:
+                size, columns, fut = pending.popleft()
+                write(fut.result(), columns)
+                n += size
+        while pending:
+            size, columns, fut = pending.popleft()
+            write(fut.result(), columns)
+            n += size
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score a CSV with the saved ASD model.")
+    parser.add_argument("input", help="CSV with the train.csv feature columns")
+    parser.add_argument("-o", "--output", help="output CSV (default: stdout)")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores for large files)")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            n = predict_csv(args.input, out, args.chunksize, args.workers, args.model_path)
+    else:
+        n = predict_csv(args.input, sys.stdout, args.chunksize, args.workers, args.model_path)
+    print(f"Scored {n} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Score a file of ISAA-50 responses offline.
+
+Reads a CSV or JSONL file of raw answers ("Never"/"Rarely"/"Sometimes"/"Often"),
+scores it with the same 50-item, 6-section scoring as the Streamlit apps and
+writes total, percent, risk band and domain scores to a CSV.
+
+Input rows carry the answers either as columns ``q1`` .. ``q50`` or, for JSONL,
+as an ``"answers"`` list.  Any other columns (Name, Age, ...) are copied through.
+Blank answers score 0.  So do labels that are not one of the four options
+(typos from paper forms); those are listed per row in the ``Unrecognised``
+column and counted at the end, or rejected outright with ``--strict``.
+The file is processed in fixed-size chunks spread over a process pool, with a
+bounded number of chunks in flight, so memory stays flat however long it is.
+
+    python batch_score.py camp_forms.csv -o camp_scores.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from instruments import load_instrument
+
+ISAA_50 = load_instrument("isaa50").questionnaire
+
+ANSWER_COLUMNS = [f"q{i}" for i in range(1, len(ISAA_50) + 1)]
+SCORE_COLUMNS = ["Score", "Max Score", "Risk %", "Risk Band"] + \
+    [f"{d} Score" for d in ISAA_50.domain_names] + ["Unrecognised"]
+
+
+# ---------- READING ----------
+def _normalise(answer):
+    # Paper forms get typed in by hand: "often ", "NEVER", ...
+    return answer.strip().capitalize() if isinstance(answer, str) else ""
+
+
+def read_csv_rows(fh):
+    """Yield ``(passthrough, answers)`` pairs from a CSV with q1..q50 columns."""
+    reader = csv.DictReader(fh)
+    missing = [c for c in ANSWER_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"input is missing answer columns: {', '.join(missing[:5])}"
+                         + (" ..." if len(missing) > 5 else ""))
+    extra = [c for c in reader.fieldnames if c not in ANSWER_COLUMNS]
+    for row in reader:
+        yield [row[c] for c in extra], [_normalise(row[c]) for c in ANSWER_COLUMNS]
+
+
+def read_jsonl_rows(fh, extra):
+    """Yield ``(passthrough, answers)`` pairs from JSON lines."""
+    for line_no, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        if "answers" in obj:
+            answers = obj["answers"]
+        else:
+            answers = [obj.get(c, "") for c in ANSWER_COLUMNS]
+        if len(answers) != len(ANSWER_COLUMNS):
+            raise ValueError(f"line {line_no}: expected {len(ANSWER_COLUMNS)} answers, got {len(answers)}")
+        yield [obj.get(c, "") for c in extra], [_normalise(a) for a in answers]
+
+
+def passthrough_columns(path, fmt):
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as fh:
+            header = next(csv.reader(fh), [])
+        return [c for c in header if c not in ANSWER_COLUMNS]
+    # JSONL: take the non-answer keys of the first record
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                return [k for k in json.loads(line) if k != "answers" and k not in ANSWER_COLUMNS]
+    return []
+
+
+# ---------- SCORING ----------
+def unrecognised(answers):
+    """``(item number, label)`` for each answer that is neither blank nor an option."""
+    return [(i, a) for i, a in enumerate(answers, start=1) if a and a not in ISAA_50.codes]
+
+
+def score_chunk(chunk, first_row=1, strict=False):
+    """Score a list of ``(passthrough, answers)`` rows.
+
+    Returns the CSV text and how many rows had unrecognised answers; with
+    ``strict`` the first such row (numbered from ``first_row``) raises ValueError.
+    """
+    codes = ISAA_50.encode_batch([answers for _, answers in chunk])
+    result = ISAA_50.score_batch(codes)
+    bands = result.bands()
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    flagged = 0
+    for i, (extra, answers) in enumerate(chunk):
+        bad = unrecognised(answers)
+        if bad and strict:
+            item, label = bad[0]
+            raise ValueError(f"response {first_row + i}, q{item}: {label!r} is not one of {list(ISAA_50.options)}")
+        flagged += bool(bad)
+        writer.writerow(extra + [int(result.total[i]), ISAA_50.max_score,
+                                 float(result.percent[i]), bands[i]]
+                        + result.domains[i].tolist() + ["; ".join(f"q{item}={label}" for item, label in bad)])
+    return out.getvalue(), flagged
+
+
+def _chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_file(in_path, out, fmt=None, chunk_size=10_000, workers=None, strict=False):
+    """Stream ``in_path`` through ISAA-50 scoring into the text stream ``out``.
+
+    Returns the number of rows scored and how many of them had unrecognised
+    answers (``strict`` raises ValueError on the first instead).
+    """
+    fmt = fmt or ("jsonl" if in_path.endswith((".jsonl", ".ndjson")) else "csv")
+    workers = workers or os.cpu_count() or 1
+    extra = passthrough_columns(in_path, fmt)
+    csv.writer(out, lineterminator="\n").writerow(extra + SCORE_COLUMNS)
+
+    n = flagged = 0
+    with open(in_path, newline="" if fmt == "csv" else None, encoding="utf-8") as fh:
+        rows = read_csv_rows(fh) if fmt == "csv" else read_jsonl_rows(fh, extra)
+        if workers == 1:
+            for chunk in _chunks(rows, chunk_size):
+                text, bad = score_chunk(chunk, n + 1, strict)
+                out.write(text)
+                n += len(chunk)
+                flagged += bad
+            return n, flagged
+
+        # Keep at most 2 chunks per worker in flight so a huge file never gets
+        # read ahead into memory; results are written back in input order.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            submitted = 0
+            for chunk in _chunks(rows, chunk_size):
+                pending.append((len(chunk), pool.submit(score_chunk, chunk, submitted + 1, strict)))
+                submitted += len(chunk)
+                if len(pending) >= 2 * workers:
+                    size, fut = pending.popleft()
+                    text, bad = fut.result()
+                    out.write(text)
+                    n += size
+                    flagged += bad
+            while pending:
+                size, fut = pending.popleft()
+                text, bad = fut.result()
+                out.write(text)
+                n += size
+                flagged += bad
+    return n, flagged
+
+
+# ---------- CLI ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score ISAA-50 responses from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV with q1..q50 columns, or JSONL")
+    parser.add_argument("-o", "--output", help="output CSV (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per chunk (default: 10000)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first answer that is not one of the options")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                n, flagged = score_file(args.input, out, args.format, args.chunk_size, args.workers, args.strict)
+        else:
+            n, flagged = score_file(args.input, sys.stdout, args.format, args.chunk_size, args.workers,
+                                    args.strict)
+    except ValueError as e:
+        parser.exit(1, f"{parser.prog}: {e}\n")
+    print(f"Scored {n} responses", file=sys.stderr)
+    if flagged:
+        print(f"Warning: {flagged} responses had unrecognised answers, scored as unanswered "
+              f"(listed in the Unrecognised column; --strict rejects them)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
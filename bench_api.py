@@ -0,0 +1,110 @@
+"""Requests per second through scoring_api.py.
+
+    python bench_api.py                      # one worker
+    python bench_api.py --workers 4 -c 64
+
+Starts the API in a temporary directory (its results.csv lands there, not in
+the repo) and drives it over keep-alive connections with a small asyncio
+client.  Three cases: scoring a single ISAA-50 response without saving, with
+saving (each request waits for its durable write), and batches of
+``--batch`` responses per request.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_imports import ROOT
+
+ANSWERS = ["Never", "Rarely", "Sometimes", "Often", "Often"] * 10
+
+
+def _request(path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    return (f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+
+
+async def _client(port, request, count, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(count):
+        t = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.decode("latin-1").splitlines()[0])
+        length = int(next(line.split(b":")[1] for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length")))
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - t)
+    writer.close()
+
+
+async def load(port, request, connections, requests):
+    """Send ``requests`` copies of ``request`` over ``connections`` connections."""
+    latencies = []
+    per_conn = max(1, requests // connections)
+    t = time.perf_counter()
+    await asyncio.gather(*(_client(port, request, per_conn, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - t
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+    }
+
+
+async def _wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        writer.close()
+        return
+    raise RuntimeError(f"API did not start on port {port}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP scoring API.")
+    parser.add_argument("--port", type=int, default=8699)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("-c", "--connections", type=int, default=32)
+    parser.add_argument("-n", "--requests", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("single, save=false", _request("/score/isaa50", {"answers": ANSWERS, "save": False}), 1),
+        ("single, saved", _request("/score/isaa50", {"answers": ANSWERS, "name": "bench"}), 1),
+        (f"batch of {args.batch}, saved",
+         _request("/score/isaa50/batch", {"responses": [{"answers": ANSWERS}] * args.batch}), args.batch),
+    ]
+    with tempfile.TemporaryDirectory() as cwd:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "scoring_api.py"), "--port", str(args.port),
+             "--workers", str(args.workers)],
+            cwd=cwd, stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(_wait_for(args.port))
+            asyncio.run(load(args.port, cases[0][1], args.connections, 1000))  # warm-up
+            for label, request, per_request in cases:
+                n = args.requests if per_request == 1 else max(args.connections, args.requests // per_request)
+                r = asyncio.run(load(args.port, request, args.connections, n))
+                print(f"{label:<24} {r['rps']:9.0f} req/s  {r['rps'] * per_request:9.0f} responses/s"
+                      f"   p50 {r['p50_ms']:6.2f} ms   p99 {r['p99_ms']:6.2f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
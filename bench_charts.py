@@ -0,0 +1,123 @@
+"""Server time and memory per result for each way the apps have drawn charts.
+
+    python bench_charts.py              # 300 results per path
+    python bench_charts.py -n 1000 vega plotly
+
+Each path runs in a fresh Python process and renders the charts of ``-n``
+results with distinct domain scores, up to the bytes Streamlit would send the
+browser.  The matplotlib, plotly and altair paths reproduce what code1.py,
+finaaal.py and final5.py did before charts.py; ``vega`` and ``png`` are
+charts.py.  Reported per path: import time, first render (which includes
+anything the path imports lazily) and mean render time, and resident memory
+after the first render and how much it grew per result.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+from bench_imports import ROOT
+
+# name -> (what it stands for, imports, body rendering one result's charts from `domains`)
+PATHS = {
+    "pyplot": ("code1.py before: bar + pie, plt.figure() never closed",
+               "import io, matplotlib\nmatplotlib.use('Agg')\nimport matplotlib.pyplot as plt", """
+for draw in (lambda: plt.bar(list(domains), list(domains.values())),
+             lambda: plt.pie(list(domains.values()), labels=list(domains), autopct='%1.1f%%')):
+    fig = plt.figure()
+    draw()
+    fig.savefig(io.BytesIO(), format="png", bbox_inches="tight", dpi=200)  # as st.pyplot
+"""),
+    "pyplot-closed": ("the same, with plt.close(fig)",
+                      "import io, matplotlib\nmatplotlib.use('Agg')\nimport matplotlib.pyplot as plt", """
+for draw in (lambda: plt.bar(list(domains), list(domains.values())),
+             lambda: plt.pie(list(domains.values()), labels=list(domains), autopct='%1.1f%%')):
+    fig = plt.figure()
+    draw()
+    fig.savefig(io.BytesIO(), format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+"""),
+    "plotly": ("finaaal.py before: gauge + bar figures",
+               "import plotly.graph_objects as go", """
+go.Figure(go.Indicator(mode="gauge+number", value=percent, gauge={"axis": {"range": [0, 100]}})).to_json()
+go.Figure([go.Bar(x=list(domains), y=list(domains.values()))]).to_json()
+"""),
+    "altair": ("final5.py before: DataFrame + altair bar",
+               "import pandas as pd, altair as alt", """
+df = pd.DataFrame({"Section": list(domains), "Score": list(domains.values())})
+alt.Chart(df).mark_bar().encode(x="Section", y="Score", tooltip=["Section", "Score"]).to_json()
+"""),
+    "vega": ("charts.py: bar + pie + gauge specs",
+             "import json, charts", """
+for spec in (charts.bar_spec(domains), charts.pie_spec(domains), charts.gauge_spec(percent)):
+    json.dumps(spec)
+"""),
+    "png": ("charts.py: domain_png (the report chart)",
+            "import charts", "charts.domain_png(domains)"),
+}
+
+_PROBE = """
+import gc, json, random, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_kib():
+    with open("/proc/self/status") as fh:
+        return next(int(line.split()[1]) for line in fh if line.startswith("VmRSS"))
+
+rng = random.Random(0)
+names = ["Social Relationship", "Communication", "Emotional Responsiveness",
+         "Cognitive Component", "Sensory & Motor", "Behaviour Pattern"]
+results = [({{n: rng.randint(0, 30) for n in names}}, rng.uniform(0, 100)) for _ in range({n} + 1)]
+
+t = time.perf_counter()
+{imports}
+imported = time.perf_counter() - t
+
+def render(domains, percent):
+{body}
+
+t = time.perf_counter()
+render(*results[0])
+first = time.perf_counter() - t
+gc.collect()
+base = rss_kib()
+t = time.perf_counter()
+for domains, percent in results[1:]:
+    render(domains, percent)
+mean = (time.perf_counter() - t) / {n}
+gc.collect()
+print(json.dumps({{"import_s": imported, "first_ms": first * 1e3, "mean_ms": mean * 1e3,
+                  "rss_mib": base / 1024, "growth_kib": (rss_kib() - base) / {n}}}))
+"""
+
+
+def measure(path, n):
+    _, imports, body = PATHS[path]
+    body = "\n".join("    " + line for line in body.strip().splitlines())
+    code = _PROBE.format(root=ROOT, n=n, imports=imports, body=body)
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True,
+                             text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chart paths of the result pages.")
+    parser.add_argument("paths", nargs="*", default=list(PATHS), help=f"any of {', '.join(PATHS)}")
+    parser.add_argument("-n", "--results", type=int, default=300)
+    args = parser.parse_args(argv)
+    unknown = set(args.paths) - set(PATHS)
+    if unknown:
+        parser.error(f"unknown path(s): {', '.join(sorted(unknown))}")
+
+    print(f"{'path':<14} {'import':>8} {'first':>9} {'per result':>11} {'RSS':>9} {'growth/result':>14}")
+    for path in args.paths:
+        r = measure(path, args.results)
+        print(f"{path:<14} {r['import_s']:7.2f}s {r['first_ms']:7.1f}ms {r['mean_ms']:9.2f}ms"
+              f" {r['rss_mib']:6.0f}MiB {r['growth_kib']:10.1f}KiB   {PATHS[path][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Dashboard load time over a large results history.
+
+    python bench_dashboard.py               # 1,000,000 stored screenings
+    python bench_dashboard.py -n 100000
+
+Writes ``-n`` synthetic screenings (three instruments, two years of dates)
+to a results.csv in a temporary directory, then times:
+
+* the one-off backfill of the rollups from that CSV;
+* one more submission through the results store (append + flush, which
+  folds the new row into the rollups);
+* ``Rollups.summary``, the domain norms and percentile lookups, and a full
+  dashboard.py page run under AppTest.
+"""
+
+import argparse
+import csv
+import datetime
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from instruments import load_instrument
+from results_store import RESULT_FIELDS, get_store, make_record
+
+
+def write_history(path, n, seed=0):
+    rng = random.Random(seed)
+    instruments = [load_instrument(i) for i in ("isaa50", "aq20", "qchat10")]
+    # a pool of scored answer sets, reused so writing a million rows stays quick
+    pool = []
+    for _ in range(500):
+        instrument = rng.choice(instruments)
+        result = instrument.questionnaire.score([rng.choice(instrument.options) for _ in instrument.items])
+        pool.append((instrument.id, result))
+    today = datetime.date.today()
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        for _ in range(n):
+            instrument_id, result = rng.choice(pool)
+            writer.writerow(make_record("", rng.randint(1, 40), rng.choice(["Male", "Female", "Other", "Select"]),
+                                        result, instrument_id,
+                                        date=today - datetime.timedelta(days=rng.randint(0, 730))))
+    return pool[0]
+
+
+def _ms(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1e3)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cohort dashboard.")
+    parser.add_argument("-n", "--screenings", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    from rollups import ROLLUP_TABLES, get_rollups
+    from streamlit.testing.v1 import AppTest
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as cwd:
+        os.chdir(cwd)
+        t = time.perf_counter()
+        instrument_id, result = write_history("results.csv", args.screenings)
+        print(f"wrote {args.screenings:,} screenings ({os.path.getsize('results.csv') / 2**20:.0f} MiB)"
+              f" in {time.perf_counter() - t:.1f}s")
+
+        rollups = get_rollups()
+        t = time.perf_counter()
+        rollups.refresh()
+        rows = sum(rollups._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                   for table in ROLLUP_TABLES)
+        print(f"backfill: {time.perf_counter() - t:.1f}s -> {rows:,} rollup rows")
+
+        store = get_store("results.csv")
+        record = make_record("bench", 5, "Female", result, instrument_id)
+        print(f"one submission, append + flush + fold: {_ms(lambda: (store.append(record), store.flush())):.1f} ms")
+        print(f"refresh with nothing new: {_ms(rollups.refresh):.2f} ms")
+        print(f"summary, all instruments, all time: {_ms(rollups.summary):.1f} ms")
+        print(f"summary, isaa50, last 12 weeks: "
+              f"{_ms(lambda: rollups.summary('isaa50', start=datetime.date.today() - datetime.timedelta(weeks=11))):.1f} ms")
+        print(f"domain norms, isaa50, all time: {_ms(lambda: rollups.norms('isaa50')):.1f} ms")
+        print(f"percentiles of one result, isaa50, age band 3-5: "
+              f"{_ms(lambda: rollups.percentiles(instrument_id, result.domains, age_band='3-5')):.1f} ms")
+
+        at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py"),
+                               default_timeout=60)
+        at.run()  # first run imports Streamlit's page machinery
+        print(f"dashboard page run (AppTest): {_ms(at.run):.0f} ms;"
+              f" the page reports {at.caption[-1].value.split(' in ')[-1]}")
+        store.close()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""First-paint time and heavy imports of the Streamlit apps.
+
+    python bench_imports.py                       # current tree
+    python bench_imports.py --baseline HEAD~1     # compare with an older commit
+
+Each app's first run (what a new visitor waits for) is timed in a fresh
+Python process with Streamlit's AppTest, so nothing is already imported.  The
+report shows the median time over ``--repeats`` processes and which heavy
+libraries (pandas, matplotlib, plotly, altair, reportlab, sklearn, pyarrow) the
+first run pulled in.  ``--baseline`` runs the same apps as they were at a
+git revision, next to the current modules, so the difference is just the app
+script itself.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_APPS = ["code.py", "code1.py", "fff.py", "finaaal.py", "final5.py", "finals.py",
+                "finalss.py", "fnl.py", "screening_app.py", "dashboard.py"]
+HEAVY = ["pandas", "matplotlib", "plotly.graph_objs", "altair", "reportlab", "sklearn", "pyarrow"]
+
+# Runs in the child: time one AppTest run and list the heavy modules it imported.
+_PROBE = """
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+heavy = {heavy!r}
+before = {{m for m in heavy if m in sys.modules}}
+t = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+elapsed = time.perf_counter() - t
+print(json.dumps({{
+    "seconds": elapsed,
+    "imported": [m.split(".")[0] for m in heavy if m in sys.modules and m not in before],
+    "errors": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def measure(app_path, repeats=3):
+    """Median first-run seconds for ``app_path`` plus the heavy modules it imported."""
+    runs = []
+    with tempfile.TemporaryDirectory() as cwd:  # results files land here, not in the repo
+        for _ in range(repeats):
+            code = _PROBE.format(root=ROOT, heavy=HEAVY, app=os.path.abspath(app_path))
+            out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True,
+                                 text=True, check=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "imported": runs[-1]["imported"],
+        "errors": runs[-1]["errors"],
+    }
+
+
+def checkout(rev, app, dest):
+    """Write ``app`` as of git revision ``rev`` into ``dest``; None if it didn't exist."""
+    res = subprocess.run(["git", "show", f"{rev}:{app}"], cwd=ROOT, capture_output=True)
+    if res.returncode != 0:
+        return None
+    path = os.path.join(dest, app)
+    with open(path, "wb") as f:
+        f.write(res.stdout)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the first paint of the Streamlit apps.")
+    parser.add_argument("apps", nargs="*", default=DEFAULT_APPS)
+    parser.add_argument("--baseline", metavar="REV", help="git revision to compare against")
+    parser.add_argument("-n", "--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as old_dir:
+        rows = []
+        for app in args.apps:
+            row = {"app": app, "now": measure(os.path.join(ROOT, app), args.repeats)}
+            if args.baseline:
+                old = checkout(args.baseline, app, old_dir)
+                row["before"] = measure(old, args.repeats) if old else None
+            rows.append(row)
+
+    for row in rows:
+        now, before = row["now"], row.get("before")
+        line = f"{row['app']:<12} {now['seconds'] * 1e3:8.0f} ms  {','.join(now['imported']) or '-':<28}"
+        if before:
+            line += (f"  was {before['seconds'] * 1e3:6.0f} ms  {','.join(before['imported']) or '-':<28}"
+                     f"  {before['seconds'] / now['seconds']:.1f}x")
+        if now["errors"]:
+            line += f"  ERROR: {now['errors'][0][:60]}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
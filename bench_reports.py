@@ -0,0 +1,59 @@
+"""Reports per second through reports.write_archive.
+
+    python bench_reports.py                  # 200 PDFs, 1 process and all cores
+    python bench_reports.py -n 1000 -j 1 4 8 --format html
+
+Synthetic ISAA-50 screenings with random answers, so nearly every report has
+its own domain chart (the worst case: no chart cache hits).  Prints the rate
+per process count and what a 10,000-report audit export would take at it.
+"""
+
+import argparse
+import io
+import os
+import random
+import time
+
+import charts
+from instruments import load_instrument
+from reports import FORMATS, write_archive
+from results_store import make_record
+
+AUDIT_SIZE = 10_000
+
+
+def synthetic_records(n, seed=0):
+    rng = random.Random(seed)
+    instrument = load_instrument("isaa50")
+    records = []
+    for i in range(n):
+        answers = [rng.choice(instrument.options) for _ in instrument.items]
+        result = instrument.questionnaire.score(answers)
+        records.append(make_record(f"participant-{i}", rng.randint(2, 16),
+                                   rng.choice(["Male", "Female", "Other"]), result, instrument="isaa50"))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bulk report rendering.")
+    parser.add_argument("-n", "--reports", type=int, default=200)
+    parser.add_argument("-j", "--processes", type=int, nargs="+",
+                        default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--format", choices=FORMATS, default="pdf")
+    args = parser.parse_args(argv)
+
+    records = synthetic_records(args.reports)
+    for processes in args.processes:
+        charts.cache_clear()  # forked workers would inherit the previous run's charts
+        buf = io.BytesIO()
+        t = time.perf_counter()
+        write_archive(records, buf, args.format, processes)
+        elapsed = time.perf_counter() - t
+        rate = len(records) / elapsed
+        print(f"{args.format} x{len(records)}, {processes} process(es): {rate:7.1f} reports/s"
+              f"  {buf.tell() / len(records) / 1024:5.1f} KiB each"
+              f"  -> {AUDIT_SIZE:,} in {AUDIT_SIZE / rate / 60:5.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Reruns and server time for one completed paged questionnaire.
+
+    python bench_reruns.py                        # fff.py and finaaal.py
+    python bench_reruns.py --baseline HEAD~1      # compare with an older commit
+
+Drives an app with Streamlit's AppTest the way a caregiver would: type the
+child's name, answer every question on every section page, page forward with
+Next, then Submit.  For each interaction it records whether the rerun was
+fragment-scoped (the widget lives inside an ``@st.fragment``) or a full
+script run, and how long the server spent on it.
+
+AppTest always executes the whole script, so the fragment's share is measured
+by timing the decorated function itself: a fragment-scoped interaction is
+charged only that time, exactly what the real server would execute.  Apps
+whose pager changes ``page`` after rendering need one extra run before the new
+section shows up; those runs are counted as ``stale`` and charged in full.
+"""
+
+import argparse
+import functools
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from bench_imports import ROOT, checkout
+from results_store import close_all
+
+DEFAULT_APPS = ["fff.py", "finaaal.py"]
+ANSWER = "Sometimes"
+
+_fragment_seconds = []  # one entry per fragment call during the current run
+
+
+def _timed_fragment(func=None, **kwargs):
+    """``st.fragment`` that also records how long each call of the body takes."""
+    if func is None:
+        return lambda f: _timed_fragment(f, **kwargs)
+
+    @functools.wraps(func)
+    def body(*args, **kw):
+        t = time.perf_counter()
+        try:
+            return func(*args, **kw)
+        finally:
+            _fragment_seconds.append(time.perf_counter() - t)
+
+    return _real_fragment(body, **kwargs)
+
+
+_real_fragment = st.fragment
+
+
+class Session:
+    """One simulated caregiver session, tallying reruns and server seconds."""
+
+    def __init__(self, app_path):
+        self.at = AppTest.from_file(app_path, default_timeout=120)
+        self.full = self.fragment = self.stale = 0
+        self.seconds = 0.0
+        self.full_times, self.fragment_times = [], []
+
+    def run(self, scoped, stale=False):
+        _fragment_seconds.clear()
+        t = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - t
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        # A fragment-scoped rerun executes only the fragment body; st.rerun()
+        # inside it (Submit) escalates to a full run, which AppTest already did.
+        if scoped and _fragment_seconds and not self._escalated():
+            self.fragment += 1
+            self.fragment_times.append(_fragment_seconds[0])
+            self.seconds += _fragment_seconds[0]
+        else:
+            self.full += 1
+            self.stale += stale
+            self.full_times.append(elapsed)
+            self.seconds += elapsed
+
+    def _escalated(self):
+        return len(_fragment_seconds) > 1  # body ran twice: st.rerun() restarted the app
+
+    def section(self):
+        return next(m.value for m in self.at.markdown if "Section" in m.value)
+
+    def complete(self, name="Benchmark"):
+        self.run(scoped=False)  # first paint
+        self.at.text_input[0].input(name)
+        self.run(scoped=False)
+        scoped = bool(_fragment_seconds)
+
+        pages = 0
+        while True:
+            pages += 1
+            for i in range(len(self.at.radio)):
+                self.at.radio[i].set_value(ANSWER)
+                self.run(scoped)
+            nxt = next(b for b in self.at.button if b.label.startswith("Next"))
+            if any("Submit" in b.label for b in self.at.button) or nxt.disabled:
+                break
+            before = self.section()
+            nxt.click()
+            self.run(scoped)
+            while self.section() == before:  # pager lagged one run behind
+                self.run(scoped=False, stale=True)
+
+        next(b for b in self.at.button if "Submit" in b.label).click()
+        self.run(scoped)
+        if not any("Total Score" in m.value for m in self.at.markdown):
+            raise RuntimeError("results did not render after Submit")
+        return {
+            "pages": pages,
+            "full": self.full,
+            "fragment": self.fragment,
+            "stale": self.stale,
+            "server_s": self.seconds,
+            "full_ms": statistics.median(self.full_times) * 1e3,
+            "fragment_ms": statistics.median(self.fragment_times) * 1e3 if self.fragment_times else None,
+        }
+
+
+def measure(app_path):
+    """Stats for one completed session, after an unrecorded warm-up session."""
+    try:
+        Session(app_path).complete()  # imports and st.cache_resource warm, as on a live server
+        return Session(app_path).complete()
+    except (RuntimeError, StopIteration, IndexError) as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+def _line(label, r):
+    if "error" in r:
+        return f"  {label:<7} ERROR: {r['error'][:80]}"
+    frag = f"{r['fragment_ms']:6.1f}" if r["fragment_ms"] is not None else "     -"
+    return (f"  {label:<7} {r['full']:4d} full ({r['stale']} stale) {r['fragment']:4d} fragment   "
+            f"median {r['full_ms']:6.1f} / {frag} ms   server {r['server_s']:6.2f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count reruns and server time for one completed questionnaire.")
+    parser.add_argument("apps", nargs="*", default=DEFAULT_APPS)
+    parser.add_argument("--baseline", metavar="REV", help="git revision to compare against")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    st.fragment = _timed_fragment
+    with tempfile.TemporaryDirectory() as cwd:  # results files land here, not in the repo
+        os.chdir(cwd)
+        for app in args.apps:
+            print(app)
+            print(_line("now", measure(os.path.join(ROOT, app))))
+            if args.baseline:
+                old = checkout(args.baseline, app, cwd)
+                print(_line("before", measure(old)) if old else f"  before  (not in {args.baseline})")
+        close_all()  # flush saved results before the directory goes away
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
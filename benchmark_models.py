@@ -0,0 +1,130 @@
+"""Cross-validated model comparison on train.csv.
+
+    python benchmark_models.py train.csv -o leaderboard.csv
+
+Runs a grid search for each candidate (logistic regression, gradient
+boosting, random forest, linear SVM) on top of the features.py preprocessor,
+using stratified k-fold CV spread over all cores.  For each model's best
+parameters it reports CV accuracy, ROC-AUC and recall at a fixed specificity,
+plus the serving cost: refit time and predict latency for a single row and for
+a batch.  The leaderboard is written as CSV (and JSON next to it), best
+ROC-AUC first.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import make_scorer, roc_curve
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.svm import LinearSVC
+
+from features import build_pipeline, split_target
+
+TARGET_SPECIFICITY = 0.90
+
+
+def recall_at_specificity(y_true, y_score, specificity=TARGET_SPECIFICITY):
+    """Highest sensitivity reachable while keeping specificity >= ``specificity``."""
+    fpr, tpr, _ = roc_curve(y_true, y_score)
+    ok = fpr <= 1 - specificity
+    return float(tpr[ok].max()) if ok.any() else 0.0
+
+
+def candidates():
+    """``name -> (estimator, param grid)``; grid keys address the pipeline's model step."""
+    return {
+        "logistic": (
+            LogisticRegression(max_iter=2000, class_weight="balanced"),
+            {"model__C": [0.01, 0.1, 1.0, 10.0]},
+        ),
+        "gradient_boosting": (
+            GradientBoostingClassifier(random_state=0),
+            {"model__n_estimators": [100, 200], "model__max_depth": [2, 3],
+             "model__learning_rate": [0.05, 0.1]},
+        ),
+        "random_forest": (
+            RandomForestClassifier(random_state=0, class_weight="balanced"),
+            {"model__n_estimators": [200, 400], "model__max_depth": [None, 8],
+             "model__min_samples_leaf": [1, 5]},
+        ),
+        "linear_svm": (
+            LinearSVC(class_weight="balanced"),
+            {"model__C": [0.01, 0.1, 1.0]},
+        ),
+    }
+
+
+def _latency(model, X, repeats):
+    """Median seconds per ``model.predict(X)`` call."""
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        model.predict(X)
+        times.append(time.perf_counter() - t)
+    return float(np.median(times))
+
+
+def run_benchmark(data, folds=5, n_jobs=-1, names=None):
+    """Return the leaderboard as a DataFrame, best ROC-AUC first."""
+    X, y = split_target(data)
+    scoring = {
+        "accuracy": "accuracy",
+        "roc_auc": "roc_auc",
+        "recall_at_spec": make_scorer(recall_at_specificity,
+                                      response_method=("decision_function", "predict_proba")),
+    }
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    batch = pd.concat([X] * max(1, 1000 // len(X) + 1)).head(1000)
+
+    rows = []
+    for name, (estimator, grid) in candidates().items():
+        if names and name not in names:
+            continue
+        search = GridSearchCV(build_pipeline(estimator), grid, scoring=scoring, refit="roc_auc",
+                              cv=cv, n_jobs=n_jobs)
+        t = time.perf_counter()
+        search.fit(X, y)
+        search_time = time.perf_counter() - t
+
+        best = search.best_index_
+        res = search.cv_results_
+        rows.append({
+            "model": name,
+            "params": json.dumps({k.split("__", 1)[1]: v for k, v in search.best_params_.items()}),
+            "accuracy": res["mean_test_accuracy"][best],
+            "accuracy_std": res["std_test_accuracy"][best],
+            "roc_auc": res["mean_test_roc_auc"][best],
+            "roc_auc_std": res["std_test_roc_auc"][best],
+            f"recall_at_spec_{TARGET_SPECIFICITY:.2f}": res["mean_test_recall_at_spec"][best],
+            "fit_time_s": res["mean_fit_time"][best],
+            "predict_1_row_ms": _latency(search.best_estimator_, X.head(1), 50) * 1e3,
+            "predict_1000_rows_ms": _latency(search.best_estimator_, batch, 10) * 1e3,
+            "search_time_s": search_time,
+            "n_candidates": len(res["params"]),
+        })
+    return pd.DataFrame(rows).sort_values("roc_auc", ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare models on train.csv with cross-validation.")
+    parser.add_argument("csv", nargs="?", default="train.csv")
+    parser.add_argument("-o", "--output", default="leaderboard.csv")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("-j", "--jobs", type=int, default=-1, help="parallel jobs (default: all cores)")
+    parser.add_argument("--models", nargs="+", choices=list(candidates()), help="subset of models to run")
+    args = parser.parse_args(argv)
+
+    board = run_benchmark(pd.read_csv(args.csv), args.folds, args.jobs, args.models)
+    board.to_csv(args.output, index=False)
+    board.to_json(args.output.rsplit(".", 1)[0] + ".json", orient="records", indent=2)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(board.drop(columns=["params"]).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
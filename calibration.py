@@ -0,0 +1,115 @@
+"""Calibrated probabilities and triage thresholds for the ASD model.
+
+    python calibration.py train.csv --method isotonic --sensitivity 0.95 --specificity 0.90
+
+Trains the features.py pipeline wrapped in ``CalibratedClassifierCV``
+(isotonic or Platt/sigmoid), so ``predict_proba`` is a usable risk estimate.
+Out-of-fold calibrated probabilities on the training data are then used to
+pick two operating points:
+
+* ``low``  -- the highest cut-off that still catches ``sensitivity`` of the
+  positive cases; below it a screening is triaged "Low risk";
+* ``high`` -- the lowest cut-off whose specificity is at least
+  ``specificity``; at or above it a screening is triaged "High risk".
+
+Everything in between goes to clinician review.  Both thresholds (and the
+share of cases that would land in review) are stored in the model artifact,
+which is saved through model_service like any other model.
+"""
+
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, roc_auc_score, roc_curve
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+from features import FEATURE_COLUMNS, build_pipeline, split_target
+from model_service import MODEL_DIR, MODEL_PATH, save_artifact
+
+
+def build_calibrated(method="isotonic", cv=5):
+    return CalibratedClassifierCV(build_pipeline(LogisticRegression(max_iter=1000)),
+                                  method=method, cv=cv)
+
+
+def tune_thresholds(y_true, proba, sensitivity=0.95, specificity=0.90):
+    """Pick the low / high triage cut-offs from (out-of-fold) probabilities."""
+    fpr, tpr, cuts = roc_curve(y_true, proba)
+    cuts = np.minimum(cuts, 1.0)  # roc_curve's first cut-off is +inf
+
+    # roc_curve cut-offs decrease as tpr rises: first index reaching the
+    # sensitivity target is the highest cut-off that meets it.
+    low = float(cuts[np.argmax(tpr >= sensitivity)])
+    # last index still within the false-positive budget is the lowest such cut-off.
+    ok = np.flatnonzero(1 - fpr >= specificity)
+    high = float(cuts[ok[-1]]) if len(ok) else 1.0
+    high = max(high, low)
+
+    proba = np.asarray(proba)
+    y_true = np.asarray(y_true)
+    review = (proba >= low) & (proba < high)
+    return {
+        "low": round(low, 4),
+        "high": round(high, 4),
+        "target_sensitivity": sensitivity,
+        "target_specificity": specificity,
+        "sensitivity_at_low": float((proba[y_true == 1] >= low).mean()),
+        "specificity_at_high": float((proba[y_true == 0] < high).mean()),
+        "review_fraction": float(review.mean()),
+    }
+
+
+def train_calibrated(data, method="isotonic", sensitivity=0.95, specificity=0.90,
+                     folds=5, model_path=MODEL_PATH, model_dir=MODEL_DIR):
+    """Fit a calibrated model, tune its thresholds, save and return the artifact."""
+    X, y = split_target(data)
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    oof = cross_val_predict(build_calibrated(method), X, y, cv=cv, method="predict_proba")[:, 1]
+    thresholds = tune_thresholds(y, oof, sensitivity, specificity)
+
+    model = build_calibrated(method).fit(X, y)
+    now = datetime.datetime.now()
+    artifact = {
+        "model": model,
+        "version": now.strftime("%Y%m%d-%H%M%S"),
+        "trained_at": now.isoformat(timespec="seconds"),
+        "features": FEATURE_COLUMNS,
+        "n_rows": len(data),
+        "accuracy": float(((oof >= 0.5) == y).mean()),
+        "calibration": {
+            "method": method,
+            "roc_auc": float(roc_auc_score(y, oof)),
+            "brier": float(brier_score_loss(y, oof)),
+        },
+        "thresholds": thresholds,
+    }
+    save_artifact(artifact, model_path, model_dir)
+    return artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a calibrated model and tune triage thresholds.")
+    parser.add_argument("csv", nargs="?", default="train.csv")
+    parser.add_argument("--method", choices=["isotonic", "sigmoid"], default="isotonic")
+    parser.add_argument("--sensitivity", type=float, default=0.95,
+                        help="share of positives that must score above the low cut-off")
+    parser.add_argument("--specificity", type=float, default=0.90,
+                        help="share of negatives that must score below the high cut-off")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    artifact = train_calibrated(pd.read_csv(args.csv), args.method, args.sensitivity,
+                                args.specificity, model_path=args.model_path)
+    t, c = artifact["thresholds"], artifact["calibration"]
+    print(f"Model {artifact['version']} ({c['method']}): ROC-AUC {c['roc_auc']:.3f}, Brier {c['brier']:.3f}")
+    print(f"Low risk below {t['low']} (sensitivity {t['sensitivity_at_low']:.2f}), "
+          f"high risk from {t['high']} (specificity {t['specificity_at_high']:.2f}), "
+          f"{t['review_fraction']:.0%} sent to review")
+
+
+if __name__ == "__main__":
+    main()
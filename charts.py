@@ -0,0 +1,190 @@
+"""Result-page charts, cached by the scores they show.
+
+Two backends:
+
+* Vega-Lite specs (the default): plain dicts the browser draws, shown with
+  ``st.vega_lite_chart(spec, width="stretch")``.  Building one is a few
+  microseconds of JSON and imports nothing -- no matplotlib, plotly, altair,
+  pandas or pyarrow on the server.
+* PNG (:func:`domain_png`): the matplotlib bar chart reports.py embeds in PDF
+  and HTML reports, for places that need an image.
+
+Specs and PNGs are cached on the domain-score vector (or the percentage for
+the gauge), so a result shown twice, or two participants with the same
+scores, cost one build:
+
+    st.vega_lite_chart(bar_spec(result.domains), width="stretch")
+    st.vega_lite_chart(gauge_spec(result.percent), width="stretch")
+    st.image(domain_png(result.domains))
+"""
+
+import contextlib
+import functools
+import io
+import json
+
+CACHE_SIZE = 1024
+COLOR = "#6C63FF"
+# (from %, to %, colour) of the risk gauge, as the plotly gauge had them
+GAUGE_BANDS = ((0, 40, "#90ee90"), (40, 60, "#f9f871"), (60, 100, "#ff7f7f"))
+
+
+def _key(domains):
+    """Hashable cache key of ``{domain: score}``."""
+    return tuple((str(d), int(s)) for d, s in domains.items())
+
+
+def _dumps(title, spec):
+    if title:
+        spec = {"title": title, **spec}
+    return json.dumps(spec)
+
+
+# ---------- VEGA-LITE SPECS ----------
+# Data sits inside a layer rather than at the top of the spec: Streamlit turns
+# top-level data into an Arrow table (importing pandas and pyarrow to do so),
+# but sends layer data along with the spec untouched.
+def bar_spec(domains, title="Domain-wise Scores", horizontal=False):
+    """Bar chart of ``{domain: score}``."""
+    return json.loads(_bar_spec(_key(domains), title, horizontal))
+
+
+def pie_spec(domains, title="Risk Contribution by Section"):
+    """Share of the total score per domain."""
+    return json.loads(_pie_spec(_key(domains), title))
+
+
+def gauge_spec(percent, title="Overall Autism Risk %"):
+    """Half-circle risk gauge over :data:`GAUGE_BANDS`."""
+    return json.loads(_gauge_spec(round(float(percent), 2), title))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _bar_spec(items, title, horizontal):
+    domain = {"field": "Domain", "type": "nominal", "sort": None, "title": None}
+    score = {"field": "Score", "type": "quantitative"}
+    if not horizontal:
+        domain["axis"] = {"labelAngle": -45, "labelLimit": 180}
+    return _dumps(title, {
+        "layer": [{
+            "data": {"values": [{"Domain": d, "Score": s} for d, s in items]},
+            "mark": {"type": "bar", "color": COLOR},
+            "encoding": {
+                "y" if horizontal else "x": domain,
+                "x" if horizontal else "y": score,
+                "tooltip": [{"field": "Domain"}, {"field": "Score"}],
+            },
+        }],
+    })
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _pie_spec(items, title):
+    total = sum(s for _, s in items) or 1
+    values = [{"Domain": d, "Score": s, "Share": f"{100 * s / total:.1f}%"} for d, s in items]
+    return _dumps(title, {
+        "layer": [{
+            "data": {"values": values},
+            "mark": {"type": "arc", "tooltip": True},
+            "encoding": {
+                "theta": {"field": "Score", "type": "quantitative", "stack": True},
+                "color": {"field": "Domain", "type": "nominal", "sort": None},
+                "order": {"field": "Score", "type": "quantitative", "sort": "descending"},
+            },
+        }],
+        "view": {"stroke": None},
+    })
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _gauge_spec(percent, title):
+    half = 1.5708  # the gauge spans -90..90 degrees, in radians
+    theta = {"field": "start", "type": "quantitative", "scale": {"domain": [0, 100], "range": [-half, half]}}
+    arc = {"theta": theta, "theta2": {"field": "end"}}
+    return _dumps(title, {
+        "height": 180,
+        "layer": [
+            {"data": {"values": [{"start": a, "end": b, "color": c} for a, b, c in GAUGE_BANDS]},
+             "mark": {"type": "arc", "innerRadius": 70, "outerRadius": 100},
+             "encoding": {**arc, "color": {"field": "color", "type": "nominal", "scale": None}}},
+            {"data": {"values": [{"start": 0, "end": percent}]},
+             "mark": {"type": "arc", "innerRadius": 78, "outerRadius": 92, "color": COLOR}, "encoding": arc},
+            {"data": {"values": [{"label": f"{percent:g}"}]},
+             "mark": {"type": "text", "fontSize": 32, "dy": -10},
+             "encoding": {"text": {"field": "label"}}},
+        ],
+        "view": {"stroke": None},
+    })
+
+
+def breakdown_spec(rows, x, y="Screenings", color=None, title=None, x_type="nominal"):
+    """Bar chart of ``rows`` (dicts), stacked by the ``color`` field if given.
+
+    Not cached, unlike the result charts: dashboard figures change with every
+    stored screening.
+    """
+    encoding = {
+        "x": {"field": x, "type": x_type, "sort": None},
+        "y": {"field": y, "type": "quantitative"},
+        "tooltip": [{"field": f} for f in (x, color, y) if f],
+    }
+    mark = {"type": "bar"}
+    if color:
+        encoding["color"] = {"field": color, "type": "nominal", "sort": None}
+        encoding["order"] = {"field": "_order", "type": "quantitative"}  # stack in the rows' order
+        rows = [{**row, "_order": i} for i, row in enumerate(rows)]
+    else:
+        mark["color"] = COLOR
+    spec = {"layer": [{"data": {"values": rows}, "mark": mark, "encoding": encoding}]}
+    if title:
+        spec = {"title": title, **spec}
+    return spec
+
+
+# ---------- PNG ----------
+@contextlib.contextmanager
+def _figure(**kwargs):
+    """A matplotlib figure that is cleared on exit.
+
+    It is created directly rather than with ``plt.figure()``, so pyplot's
+    figure registry never holds on to it; clearing frees its artists even if
+    the caller keeps a reference.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+
+
+def domain_png(domains):
+    """PNG bar chart of ``{domain: score}``; drawn once per distinct set of scores."""
+    return _domain_png(_key(domains))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _domain_png(items):
+    names = [d for d, _ in items][::-1]
+    scores = [s for _, s in items][::-1]
+    height = 0.45 * len(items) + 0.9
+    with _figure(figsize=(6, height), dpi=100) as fig:
+        # fixed margins sized from the labels: tight_layout would cost a second draw
+        left = min(0.55, 0.1 + 0.075 * max(len(n) for n in names) / 6)
+        fig.subplots_adjust(left=left, right=0.96, bottom=0.55 / height, top=1 - 0.35 / height)
+        ax = fig.add_subplot()
+        ax.barh(names, scores, color=COLOR)
+        ax.set_xlabel("Score (higher = more autistic traits)")
+        ax.set_title("Domain-wise Scores")
+        for side in ("top", "right"):
+            ax.spines[side].set_visible(False)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def cache_clear():
+    """Drop every cached spec and PNG."""
+    for cached in (_bar_spec, _pie_spec, _gauge_spec, _domain_png):
+        cached.cache_clear()
@@ -1,10 +1,6 @@
 import streamlit as st
-import pandas as pd
-import sklearn
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score
-import joblib
+import io
+from model_service import load_model, predict, predict_proba, triage
 
 st.title("ASD Detection App")
 st.subheader("Upload data or take the quiz")
@@ -13,39 +9,80 @@ st.subheader("Upload data or take the quiz")
 uploaded_file = st.file_uploader("Upload ASD dataset (.csv)", type=["csv"])
 
 if uploaded_file:
+    # pandas and sklearn (via features) load only once a file is uploaded
+    import pandas as pd
+    from features import TARGET_COLUMNS, find_target
+
     data = pd.read_csv(uploaded_file)
 
     st.write("### Dataset Preview", data.head())
 
-    # Assume target column is 'Class/ASD Traits '
-    if 'Class/ASD Traits ' in data.columns:
-        X = data.drop(columns=['Class/ASD Traits '])
-        y = data['Class/ASD Traits '].apply(lambda x: 1 if x == 'YES' else 0)
-
-        st.write(f"Shape: {X.shape}, Target Distribution: {y.value_counts()}")
+    # Saved model is loaded once per process and reused until model.pkl changes
+    artifact = load_model()
 
-        # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Training only happens when asked for, never on a plain rerun
+    if find_target(data) is not None:
+        if st.button("Train new model"):
+            from calibration import train_calibrated
 
-        # Train model
-        model = LogisticRegression(max_iter=1000)
-        model.fit(X_train, y_train)
+            # Retrain calibrated, with the current model's method and targets,
+            # so the triage thresholds are tuned again rather than dropped.
+            previous = artifact or {}
+            settings = {"method": previous.get("calibration", {}).get("method", "isotonic")}
+            if "thresholds" in previous:
+                settings.update(sensitivity=previous["thresholds"]["target_sensitivity"],
+                                specificity=previous["thresholds"]["target_specificity"])
+            with st.spinner("Training and calibrating..."):
+                artifact = train_calibrated(data, **settings)
+            st.success(f"Model {artifact['version']} trained with accuracy: {artifact['accuracy']:.2f}")
+    else:
+        st.info(f"No '{TARGET_COLUMNS[0]}' column - upload labelled data to train a model.")
 
-        # Save model
-        joblib.dump(model, "model.pkl")
+    if artifact is None:
+        st.warning("No trained model yet. Upload a labelled dataset and train one.")
+    else:
+        st.caption(f"Using model {artifact['version']} (trained {artifact['trained_at']})")
+        missing = [c for c in artifact["features"] if c not in data.columns]
+        if missing:
+            st.warning(f"Dataset is missing model features: {', '.join(missing)}")
+        else:
+            st.write("### Predictions")
+            preds = predict(data)
+            data['Predicted'] = preds
+            data['ASD Probability'] = predict_proba(data).round(3)
+            if "thresholds" in artifact:
+                # Calibrated model: triage by probability instead of a hard 0/1
+                t = artifact["thresholds"]
+                data['Triage'] = triage(data['ASD Probability'], t)
+                st.caption(f"Low risk below {t['low']:.2f}, clinician review up to "
+                           f"{t['high']:.2f}, high risk above.")
+                st.write(data[['Triage']].value_counts())
+            else:
+                st.write(data[['Predicted']].value_counts())
+            st.dataframe(data[['ASD Probability', 'Predicted'] +
+                              (['Triage'] if 'Triage' in data else [])].head(20))
 
-        # Accuracy
-        y_pred = model.predict(X_test)
-        acc = accuracy_score(y_test, y_pred)
-        st.success(f"Model trained with accuracy: {acc:.2f}")
+# Batch prediction on a new file with the saved model
+st.markdown("---")
+st.header("Batch Prediction")
+st.write("Score a whole file (same columns as train.csv) with the saved model. "
+         "Each row gets a probability and a predicted class (and a triage band "
+         "if the model was calibrated).")
+batch_file = st.file_uploader("Upload file to score (.csv)", type=["csv"], key="batch_file")
 
-        # Prediction on uploaded data
-        st.write("### Predict on the same data")
-        preds = model.predict(X)
-        data['Predicted'] = preds
-        st.write(data[['Predicted']].value_counts())
+if batch_file and st.button("Score file"):
+    if load_model() is None:
+        st.warning("No trained model yet. Upload a labelled dataset and train one.")
     else:
-        st.warning("Expected column 'Class/ASD Traits ' not found in the dataset.")
+        from batch_predict import predict_csv
+
+        scored = io.StringIO()
+        with st.spinner("Scoring..."):
+            n_rows = predict_csv(batch_file, scored)
+        st.success(f"Scored {n_rows} rows")
+        st.download_button("⬇ Download predictions", scored.getvalue(),
+                           file_name=f"{batch_file.name.rsplit('.', 1)[0]}_predictions.csv",
+                           mime="text/csv")
 
 # QCHAT-10 manual screening
 st.markdown("---")
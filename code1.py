@@ -1,8 +1,7 @@
 import streamlit as st
-import pandas as pd
-import datetime
-import os
-import matplotlib.pyplot as plt
+from charts import bar_spec, pie_spec
+from instruments import load_instrument
+from results_store import get_store, make_record
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(
@@ -46,140 +45,78 @@ Caregivers should answer based on how often the child shows each behaviour.
 
 st.markdown("---")
 
-# ---------------- USER DETAILS ----------------
-name = st.text_input("Child's Name")
-age = st.number_input("Age", min_value=1, max_value=100)
-gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
-
-st.markdown("---")
-
-# ---------------- QUESTION SECTIONS ----------------
-sections = {
-"Social Interaction & Responsiveness": [
-"Maintains eye contact while talking",
-"Responds to their name",
-"Shows interest in other children",
-"Participates in group play",
-"Interacts socially at home",
-"Interacts socially outside",
-"Maintains friendships",
-"Behaves appropriately in groups"
-],
-"Communication & Language": [
-"Understands simple instructions",
-"Expresses emotions appropriately",
-"Communicates needs",
-"Uses gestures",
-"Forms sentences",
-"Uses language socially",
-"Initiates conversation",
-"Communicates with teachers"
-],
-"Behaviour & Adaptability": [
-"Follows routines easily",
-"Adapts to change",
-"Follows classroom rules",
-"Participates in activities",
-"Sits calmly when needed",
-"Displays age-appropriate behaviour",
-"Reacts normally to change",
-"Seeks help when needed"
-],
-"Sensory Response": [
-"Reacts normally to noise",
-"Reacts normally to touch",
-"Reacts normally to light",
-"Reacts normally to sensory input"
-],
-"Cognitive & Learning Skills": [
-"Performs age-appropriate learning",
-"Understands others’ feelings",
-"Shows empathy",
-"Matches patterns",
-"Copies actions",
-"Explores environment normally",
-"Expresses curiosity",
-"Shows imaginative or pretend play"
-],
-"Motor & Coordination": [
-"Shows appropriate motor skills",
-"Coordinates hand movements",
-"Uses hand-eye coordination well",
-"Engages in normal activities",
-"Laughs or smiles appropriately",
-"Responds when spoken to",
-"Uses appropriate language",
-"Plays normally with toys"
-]
-}
-
-options = ["Select","Never","Rarely","Sometimes","Often"]
-
-# ---------------- SESSION STATE ----------------
-if "answers" not in st.session_state:
-    st.session_state.answers = {}
-
-total_questions = sum(len(q) for q in sections.values())
-
-# ---------------- PROGRESS ----------------
-answered = len([a for a in st.session_state.answers.values() if a!="Select"])
-st.progress(answered/total_questions)
-st.write(f"Progress: **{answered}/{total_questions} answered**")
-
-st.markdown("---")
-
-# ---------------- DISPLAY QUESTIONS ----------------
-q_index = 0
-for section, qs in sections.items():
-    st.markdown(f"<div class='section-title'> {section}</div>", unsafe_allow_html=True)
-
-    for q in qs:
-        q_index += 1
-        key = f"q{q_index}"
-
-        st.markdown(f"<div class='card'><b>{q_index}. {q}</b></div>", unsafe_allow_html=True)
-
-        if key not in st.session_state.answers:
-            st.session_state.answers[key] = "Select"
-
-        st.session_state.answers[key] = st.selectbox(
-            f"Select answer for {q_index}",
-            options,
-            key=key,
-            label_visibility="collapsed"
-        )
-
-st.markdown("---")
-
-# ---------------- REVERSED RISK SCORING ----------------
-score_map = {
-    "Never":3,
-    "Rarely":2,
-    "Sometimes":1,
-    "Often":0,
-    "Select":0
-}
+# ---------------- QUESTION SECTIONS (definitions/isaa50-domains.json) ----------------
+instrument = load_instrument("isaa50-domains")
+questionnaire = instrument.questionnaire  # reversed risk scoring; "Select" scores 0
+options = ["Select", *instrument.options]
+
+# ---------------- CACHED LAYOUT ----------------
+# Built once per process and definition version: the section/card HTML for
+# every question, so reruns only emit ready-made strings.  Keyed on the id and
+# version, which are cheap to hash, rather than on the question text.
+@st.cache_resource
+def get_layout(instrument_id, version):
+    blocks = []
+    q_index = 0
+    for section, qs in load_instrument(instrument_id).section_dict().items():
+        cards = []
+        for q in qs:
+            q_index += 1
+            cards.append((f"q{q_index}", q_index, f"<div class='card'><b>{q_index}. {q}</b></div>"))
+        blocks.append((f"<div class='section-title'> {section}</div>", tuple(cards)))
+    return tuple(blocks)
+
+blocks = get_layout(instrument.id, instrument.version)
+total_questions = len(questionnaire)
+
+# ---------------- FORM ----------------
+# Everything is entered in one form: picking an answer doesn't rerun the
+# script, only the submit button does.
+answers = {}
+with st.form("screening"):
+    # ---------------- USER DETAILS ----------------
+    name = st.text_input("Child's Name")
+    age = st.number_input("Age", min_value=1, max_value=100)
+    gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
+
+    st.markdown("---")
+
+    # ---------------- DISPLAY QUESTIONS ----------------
+    for section_html, cards in blocks:
+        st.markdown(section_html, unsafe_allow_html=True)
+        for key, q_index, card_html in cards:
+            st.markdown(card_html, unsafe_allow_html=True)
+            answers[key] = st.selectbox(
+                f"Select answer for {q_index}",
+                options,
+                key=key,
+                label_visibility="collapsed"
+            )
+
+    st.markdown("---")
+    submitted = st.form_submit_button("✔ Submit & View Result", type="primary")
 
 def compute_score():
-    return sum(score_map[a] for a in st.session_state.answers.values())
+    return questionnaire.score([answers[f"q{i}"] for i in range(1, total_questions+1)])
 
 # ---------------- SUBMIT ----------------
-if st.button("✔ Submit & View Result", type="primary"):
-
-    if "Select" in st.session_state.answers.values():
-        st.error("Please answer ALL questions before submitting.")
+if submitted:
+    unanswered = sum(a == "Select" for a in answers.values())
+    if unanswered:
+        st.error(f"Please answer ALL questions before submitting ({unanswered} of {total_questions} left).")
     else:
-        total = compute_score()
-        percent = round((total/(total_questions*3))*100,2)
+        result = compute_score()
+        total = result.total
+        percent = result.percent
 
         st.subheader(" Screening Summary")
         st.write(f"**Risk Score:** {total} / {total_questions*3}")
         st.write(f"**Risk Level:** {percent}%")
 
         # --- Feedback ---
-        if percent >= 60:
+        if result.band == "High":
             st.error(" Higher likelihood of autistic behavioural traits. Professional assessment recommended.")
-        elif percent >= 40:
+        elif result.band == "Moderate":
             st.warning(" Mild-moderate likelihood. Monitoring recommended.")
         else:
             st.success(" Low likelihood of autistic behavioural traits.")
@@ -187,20 +124,9 @@ if st.button("✔ Submit & View Result", type="primary"):
         st.info("This screening tool is for awareness only.")
 
         # ---------------- CSV SAVE ----------------
-        df = pd.DataFrame([{
-            "Name": name,
-            "Age": age,
-            "Gender": gender,
-            "Risk Score": total,
-            "Risk %": percent,
-            "Date": datetime.date.today()
-        }])
-
-        df.to_csv(
-            "screening_results.csv",
-            mode="a",
-            header=not os.path.exists("screening_results.csv"),
-            index=False
+        get_store("screening_results.csv").append(
+            make_record(name, age, gender, result, instrument="isaa50-domains"),
+            answers=[answers[f"q{i}"] for i in range(1, total_questions+1)],
         )
 
         st.success(" Result saved")
@@ -208,29 +134,10 @@ if st.button("✔ Submit & View Result", type="primary"):
         # ---------------- GRAPHS ----------------
         st.subheader(" Risk Distribution")
 
-        section_scores = []
-        section_labels = []
-
-        start = 0
-        for sec, qs in sections.items():
-            end = start + len(qs)
-            ans = list(st.session_state.answers.values())[start:end]
-            sec_score = sum(score_map[a] for a in ans)
-            section_scores.append(sec_score)
-            section_labels.append(sec)
-            start = end
-
         # ---- BAR GRAPH ----
-        fig1 = plt.figure()
-        plt.bar(section_labels, section_scores)
-        plt.xticks(rotation=70)
-        plt.title("Section-wise Risk Scores")
-        st.pyplot(fig1)
+        st.vega_lite_chart(bar_spec(result.domains, title="Section-wise Risk Scores"), width="stretch")
 
         # ---- PIE CHART ----
-        fig2 = plt.figure()
-        plt.pie(section_scores, labels=section_labels, autopct='%1.1f%%')
-        plt.title("Risk Contribution by Section")
-        st.pyplot(fig2)
+        st.vega_lite_chart(pie_spec(result.domains), width="stretch")
 
         st.balloons()
@@ -0,0 +1,250 @@
+"""Compact, numpy-only form of a trained linear ASD model.
+
+    python compact_model.py model.pkl -o model.npz
+    python batch_predict.py registry.csv --model-path model.npz
+
+A ``model.pkl`` artifact holds a whole sklearn pipeline, so every process that
+loads it imports sklearn and unpickles the estimator before its first
+prediction.  For the models we actually serve -- logistic regression (or
+``SGDClassifier(loss="log_loss")``) behind the features.py preprocessor,
+optionally wrapped in calibration.py's ``CalibratedClassifierCV`` -- the maths is
+small enough to write down:
+
+* numeric columns: fill value, then ``(x - mean) / scale``;
+* categorical columns: a value -> feature-index table (dropped binary levels
+  and infrequent/unknown values resolved at export time);
+* one coefficient vector and intercept, squashed with the logistic function;
+* for calibrated models, one such member per CV fold plus its sigmoid or
+  isotonic calibrator, averaged like sklearn does.
+
+:func:`export_compact` writes that into a single ``.npz`` (arrays plus a JSON
+header, no pickles) and :func:`load_compact` reads it back as an artifact
+dict whose ``"model"`` has ``predict`` / ``predict_proba``, so it drops in
+wherever model_service's artifacts are used.  Only numpy is imported here.
+Pipelines with other estimators (trees, SVMs) are not supported and raise
+``ValueError``.
+"""
+
+import argparse
+import json
+import math
+import warnings
+
+import numpy as np
+
+FORMAT_VERSION = 1
+UNSEEN = "\x00unseen"  # probe value no real category can equal
+
+
+# ---------- EXPORT ----------
+def _linear_weights(estimator):
+    name = type(estimator).__name__
+    if name == "SGDClassifier" and estimator.loss != "log_loss":
+        raise ValueError(f"SGDClassifier(loss={estimator.loss!r}) has no probabilities to export")
+    if name not in ("LogisticRegression", "SGDClassifier"):
+        raise ValueError(f"compact export supports logistic models only, not {name}")
+    return estimator.coef_.ravel().astype(np.float64), float(np.ravel(estimator.intercept_)[0])
+
+
+def _category_tables(encoder):
+    """Per categorical column: ``{value: feature index or -1}`` and the unseen index."""
+    n_cols = len(encoder.categories_)
+    names = encoder.get_feature_names_out([f"c{i}" for i in range(n_cols)])
+    widths = [sum(n.startswith(f"c{i}_") for n in names) for i in range(n_cols)]
+    offsets = np.concatenate([[0], np.cumsum(widths)])
+
+    tables = []
+    base = [cats[0] for cats in encoder.categories_]
+    for i, cats in enumerate(encoder.categories_):
+        probe = np.array([base] * (len(cats) + 1), dtype=object)
+        probe[:, i] = list(cats) + [UNSEEN]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # the unseen probe warns by design
+            block = encoder.transform(probe)
+        block = (block.toarray() if hasattr(block, "toarray") else block)[:, offsets[i]:offsets[i + 1]]
+        hits = [int(np.flatnonzero(row)[0]) + int(offsets[i]) if row.any() else -1 for row in block]
+        tables.append({"values": [str(c) for c in cats], "index": hits[:-1], "unseen": hits[-1]})
+    return tables
+
+
+def _export_pipeline(pipeline):
+    """One member: preprocessing stats + linear weights for a features.py pipeline."""
+    columns = pipeline.named_steps["prep"].named_steps["columns"]
+    num_pipe, num_cols = columns.named_transformers_["num"], None
+    cat_pipe, cat_cols = columns.named_transformers_["cat"], None
+    for name, _, cols in columns.transformers_:
+        if name == "num":
+            num_cols = list(cols)
+        elif name == "cat":
+            cat_cols = list(cols)
+
+    coef, intercept = _linear_weights(pipeline.named_steps["model"])
+    scaler = num_pipe.named_steps["scale"]
+    member = {
+        "numeric": num_cols,
+        "categorical": cat_cols,
+        "fill": num_pipe.named_steps["impute"].statistics_.astype(np.float64),
+        "mean": scaler.mean_.astype(np.float64),
+        "scale": scaler.scale_.astype(np.float64),
+        "missing": cat_pipe.named_steps["impute"].fill_value,
+        "tables": _category_tables(cat_pipe.named_steps["onehot"]),
+        "coef": coef,
+        "intercept": intercept,
+        "calibrator": None,
+    }
+    width = len(num_cols) + len(cat_pipe.named_steps["onehot"].get_feature_names_out())
+    if len(coef) != width:
+        raise ValueError(f"model has {len(coef)} coefficients for {width} encoded features")
+    return member
+
+
+def _export_members(model):
+    if type(model).__name__ != "CalibratedClassifierCV":
+        return [_export_pipeline(model)], None
+    if model.method not in ("sigmoid", "isotonic"):
+        raise ValueError(f"calibration method {model.method!r} is not supported")
+    members = []
+    for fold in model.calibrated_classifiers_:
+        member = _export_pipeline(fold.estimator)
+        cal = fold.calibrators[0]
+        if model.method == "sigmoid":
+            member["calibrator"] = {"a": float(cal.a_), "b": float(cal.b_)}
+        else:
+            member["calibrator"] = {"x": np.asarray(cal.X_thresholds_, np.float64),
+                                    "y": np.asarray(cal.y_thresholds_, np.float64)}
+        members.append(member)
+    return members, model.method
+
+
+def export_compact(artifact, path):
+    """Write ``artifact`` (as returned by model_service.load_model) to ``path`` (.npz)."""
+    members, calibration = _export_members(artifact["model"])
+    arrays = {}
+    header_members = []
+    for k, m in enumerate(members):
+        for key in ("fill", "mean", "scale", "coef"):
+            arrays[f"m{k}_{key}"] = m[key]
+        cal = m["calibrator"]
+        if cal is not None and "x" in cal:
+            arrays[f"m{k}_iso_x"], arrays[f"m{k}_iso_y"] = cal["x"], cal["y"]
+            cal = "isotonic"
+        header_members.append({
+            "numeric": m["numeric"], "categorical": m["categorical"], "missing": m["missing"],
+            "tables": m["tables"], "intercept": m["intercept"], "calibrator": cal,
+        })
+    header = {
+        "format": FORMAT_VERSION,
+        "calibration": calibration,
+        "members": header_members,
+    }
+    for key in ("version", "trained_at", "features", "n_rows", "accuracy", "thresholds"):
+        if key in artifact:
+            header[key] = artifact[key]
+    arrays["header"] = np.array(json.dumps(header, default=float))
+    with open(path, "wb") as f:  # keep the exact name; np.savez would append .npz
+        np.savez(f, **arrays)
+    return path
+
+
+# ---------- SCORING ----------
+def _column(data, name):
+    """Column ``name`` of a DataFrame, dict of columns or list of row dicts."""
+    if isinstance(data, list):
+        return np.array([row.get(name) for row in data], dtype=object)
+    return np.asarray(data[name], dtype=object)
+
+
+def _to_float(values):
+    out = np.empty(len(values))
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v)
+        except (TypeError, ValueError):
+            out[i] = math.nan
+    return out
+
+
+def _clean_category(v, missing):
+    """Same normalisation as features.clean_frame + the constant imputer."""
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return missing
+    v = v.strip() if isinstance(v, str) else str(v)
+    return missing if v in ("", "?") else v
+
+
+class _Member:
+    def __init__(self, spec, arrays, k):
+        self.numeric = spec["numeric"]
+        self.categorical = spec["categorical"]
+        self.missing = spec["missing"]
+        self.lookups = [(dict(zip(t["values"], t["index"])), t["unseen"]) for t in spec["tables"]]
+        self.fill = arrays[f"m{k}_fill"]
+        self.mean = arrays[f"m{k}_mean"]
+        self.scale = arrays[f"m{k}_scale"]
+        self.coef = arrays[f"m{k}_coef"]
+        self.intercept = spec["intercept"]
+        cal = spec["calibrator"]
+        if cal == "isotonic":
+            self.calibrate = lambda z, x=arrays[f"m{k}_iso_x"], y=arrays[f"m{k}_iso_y"]: np.interp(z, x, y)
+        elif cal is not None:
+            self.calibrate = lambda z, a=cal["a"], b=cal["b"]: 1.0 / (1.0 + np.exp(a * z + b))
+        else:
+            self.calibrate = lambda z: 1.0 / (1.0 + np.exp(-z))
+
+    def decision(self, data):
+        num = np.column_stack([_to_float(_column(data, c)) for c in self.numeric])
+        num = np.where(np.isnan(num), self.fill, num)
+        z = ((num - self.mean) / self.scale) @ self.coef[:len(self.numeric)] + self.intercept
+        for col, (lookup, unseen) in zip(self.categorical, self.lookups):
+            idx = np.fromiter((lookup.get(_clean_category(v, self.missing), unseen)
+                               for v in _column(data, col)), dtype=np.int64)
+            hit = idx >= 0
+            z[hit] += self.coef[len(self.numeric) + idx[hit]]
+        return z
+
+    def proba(self, data):
+        return self.calibrate(self.decision(data))
+
+
+class CompactModel:
+    """Dependency-light stand-in for the pickled pipeline (binary, classes 0/1)."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, header, arrays):
+        self.calibration = header["calibration"]
+        self.members = [_Member(spec, arrays, k) for k, spec in enumerate(header["members"])]
+
+    def predict_proba(self, data):
+        p = np.mean([m.proba(data) for m in self.members], axis=0)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, data):
+        return (self.predict_proba(data)[:, 1] > 0.5).astype(np.int64)
+
+
+def load_compact(path):
+    """Read an .npz written by :func:`export_compact` into an artifact dict."""
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {k: npz[k] for k in npz.files}
+    header = json.loads(str(arrays.pop("header")))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported compact model format {header.get('format')!r}")
+    artifact = {k: v for k, v in header.items() if k not in ("format", "members", "calibration")}
+    artifact["model"] = CompactModel(header, arrays)
+    return artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a trained model.pkl to the compact .npz format.")
+    parser.add_argument("model", nargs="?", default="model.pkl")
+    parser.add_argument("-o", "--output", default="model.npz")
+    args = parser.parse_args(argv)
+
+    import joblib  # only the export side needs to unpickle sklearn objects
+    export_compact(joblib.load(args.model), args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
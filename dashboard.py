@@ -0,0 +1,144 @@
+"""Cohort dashboard over the stored screenings.
+
+    streamlit run dashboard.py
+
+(also the "Cohort dashboard" page of screening_app.py).  Every figure comes
+from the rollup tables in rollups.py, which are updated as results are stored,
+so a page load is a handful of group-bys over a few thousand rollup rows
+however many screenings there are -- results.csv is never re-read.  Picking
+one instrument adds its domain norms (mean, SD, percentiles) for an age band
+and gender.
+"""
+
+import datetime
+import time
+
+import streamlit as st
+from charts import breakdown_spec
+from instruments import available_instruments, load_instrument
+from rollups import AGE_BANDS, get_rollups, quantile
+
+ALL = "All instruments"
+PERIODS = {"Last 4 weeks": 4, "Last 12 weeks": 12, "Last 52 weeks": 52, "All time": None}
+AGE_ORDER = [label for _, _, label in AGE_BANDS] + ["Unknown"]
+NORM_QUANTILES = (10, 25, 50, 75, 90)
+# The results store folds rows into the rollups as it flushes; the page only
+# re-checks the results files this often, not on every rerun.
+REFRESH_SECONDS = 60
+
+
+def _title(instrument_id):
+    if instrument_id == ALL:
+        return ALL
+    if instrument_id in available_instruments():
+        return load_instrument(instrument_id).title
+    return instrument_id or "(not recorded)"
+
+
+def _band_order(instrument_id, bands):
+    """Risk bands lowest first, as the instruments define them."""
+    ids = available_instruments() if instrument_id == ALL else [instrument_id]
+    order = []
+    for i in ids:
+        if i not in available_instruments():
+            continue
+        previous = None
+        for band in load_instrument(i).questionnaire.band_labels:
+            if band not in order:  # e.g. Moderate goes between Low and High
+                order.insert(order.index(previous) + 1 if previous else 0, band)
+            previous = band
+    return [b for b in order if b in bands] + sorted(b for b in bands if b not in order)
+
+
+def _stacked(rows, field, order, bands):
+    """``[{field, "Band", "Screenings"}]`` from (group, band, n) rows, in display order."""
+    counts = {(g, b): n for g, b, n in rows}
+    groups = [g for g in order if any((g, b) in counts for b in bands)]
+    return [{field: g, "Band": b, "Screenings": counts[g, b]}
+            for g in groups for b in bands if (g, b) in counts]
+
+
+def domain_norms(rollups, instrument, start):
+    """Mean, SD and percentiles of each domain for an age band and gender."""
+    st.subheader("Domain norms")
+    col1, col2 = st.columns(2)
+    age = col1.selectbox("Age band", ["All ages", *AGE_ORDER])
+    gender = col2.selectbox("Gender", ["All genders", "Male", "Female", "Other", "Unspecified"])
+    cohort = {"age_band": None if age == "All ages" else age,
+              "gender": None if gender == "All genders" else gender, "start": start}
+    norms = rollups.norms(instrument, **cohort)
+    if not norms:
+        st.info("No screenings in this group.")
+        return
+    histograms = rollups.histograms(instrument, **cohort)
+    lines = ["| Domain | n | Mean | SD | " + " | ".join(f"P{q}" for q in NORM_QUANTILES) + " |",
+             "|---|---:|---:|---:|" + "---:|" * len(NORM_QUANTILES)]
+    for domain, norm in norms.items():
+        quantiles = " | ".join(str(quantile(histograms[domain], q)) for q in NORM_QUANTILES)
+        lines.append(f"| {domain} | {norm['n']:,} | {norm['mean']} | {norm['sd']} | {quantiles} |")
+    st.markdown("\n".join(lines))
+
+
+def dashboard_page():
+    started = time.perf_counter()
+    rollups = get_rollups()
+    rollups.refresh(max_age=REFRESH_SECONDS)
+
+    st.title("Cohort dashboard")
+    instruments = rollups.instruments()
+    if not instruments:
+        st.info("No screenings stored yet.")
+        return
+
+    col1, col2 = st.columns(2)
+    instrument = col1.selectbox("Instrument", [ALL, *instruments], format_func=_title)
+    period = col2.selectbox("Period", list(PERIODS), index=1)
+    weeks = PERIODS[period]
+    start = datetime.date.today() - datetime.timedelta(weeks=weeks - 1) if weeks else None
+
+    summary = rollups.summary(None if instrument == ALL else instrument, start=start)
+    total = summary["screenings"]
+    if not total:
+        st.info("No screenings in this period.")
+        return
+    bands = _band_order(instrument, summary["by_band"])
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Screenings", f"{total:,}")
+    col2.metric("Mean risk %", f"{summary['mean_percent']}%")
+    col3.metric(f"{bands[-1]} band", f"{100 * summary['by_band'][bands[-1]] / total:.1f}%")
+
+    col1, col2 = st.columns(2)
+    col1.vega_lite_chart(breakdown_spec(
+        [{"Band": b, "Screenings": summary["by_band"][b]} for b in bands], "Band",
+        title="Screenings by risk band"), width="stretch")
+    col2.vega_lite_chart(breakdown_spec(
+        [{"Risk %": f"{b}-{b + 10 if b == 90 else b + 9}", "Screenings": summary["percent_histogram"].get(b, 0)}
+         for b in range(0, 100, 10)], "Risk %", title="Risk % distribution"), width="stretch")
+
+    weekly = [row for row in summary["by_week"] if row[0]]  # undated legacy rows have no week
+    st.vega_lite_chart(breakdown_spec(
+        _stacked(weekly, "Week", sorted({w for w, _, _ in weekly}), bands), "Week", color="Band",
+        x_type="temporal", title="Screenings per week"), width="stretch")
+
+    col1, col2 = st.columns(2)
+    col1.vega_lite_chart(breakdown_spec(
+        _stacked(summary["by_age"], "Age", AGE_ORDER, bands), "Age", color="Band",
+        title="By age"), width="stretch")
+    col2.vega_lite_chart(breakdown_spec(
+        _stacked(summary["by_gender"], "Gender", ["Male", "Female", "Other", "Unspecified"], bands),
+        "Gender", color="Band", title="By gender"), width="stretch")
+
+    if instrument != ALL and summary["domain_means"]:
+        st.vega_lite_chart(breakdown_spec(
+            [{"Domain": d, "Mean score": m} for d, m in summary["domain_means"].items()], "Domain",
+            y="Mean score", title="Mean score per domain"), width="stretch")
+        domain_norms(rollups, instrument, start)
+
+    st.caption(f"{total:,} screenings, from the rollup tables in "
+               f"{(time.perf_counter() - started) * 1e3:.0f} ms.")
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="Cohort dashboard", layout="wide")
+    dashboard_page()
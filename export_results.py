@@ -0,0 +1,246 @@
+"""Compact the append-only results CSVs into partitioned Parquet.
+
+    python export_results.py results.csv screening_results.csv -o results_parquet
+
+Rows are written with real types (Date as a date, Age/Score as integers,
+Risk % as a float, domain scores as a map) under hive-style partitions
+``month=YYYY-MM/risk_band=<band>/``.  A small state file remembers how far
+into each CSV the last run got, so every run only converts rows appended since
+then.  Load the result with :func:`load_results`, which reads the dataset
+memory-mapped and column by column.
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs
+except ImportError as exc:  # pragma: no cover
+    raise ImportError("export_results.py needs pyarrow: pip install pyarrow") from exc
+
+from results_store import RESULT_FIELDS
+
+STATE_FILE = "_export_state.json"
+CHUNK_BYTES = 16 * 1024 * 1024
+
+SCHEMA = pa.schema([
+    ("name", pa.string()),
+    ("age", pa.int16()),
+    ("gender", pa.dictionary(pa.int8(), pa.string())),
+    ("score", pa.int32()),
+    ("percent", pa.float64()),
+    ("date", pa.date32()),
+    ("max_score", pa.int32()),
+    ("instrument", pa.dictionary(pa.int8(), pa.string())),
+    ("domain_scores", pa.map_(pa.string(), pa.int32())),
+    ("source", pa.dictionary(pa.int8(), pa.string())),
+    ("month", pa.string()),
+    ("risk_band", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("month", pa.string()), ("risk_band", pa.string())]),
+                               flavor="hive")
+
+
+# ---------- PARSING ----------
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _domains(value):
+    if not value:
+        return None
+    try:
+        return [(k, _int(v)) for k, v in json.loads(value).items()]
+    except (ValueError, AttributeError):
+        return None
+
+
+def rows_to_table(rows, source):
+    """Convert ``RESULT_FIELDS`` dict rows into an Arrow table of ``SCHEMA``."""
+    dates = [_date(r.get("Date")) for r in rows]
+    columns = {
+        "name": [r.get("Name") or None for r in rows],
+        "age": [_int(r.get("Age")) for r in rows],
+        "gender": [r.get("Gender") or None for r in rows],
+        "score": [_int(r.get("Score")) for r in rows],
+        "percent": [_float(r.get("Risk %")) for r in rows],
+        "date": dates,
+        "max_score": [_int(r.get("Max Score")) for r in rows],
+        "instrument": [r.get("Instrument") or None for r in rows],
+        "domain_scores": [_domains(r.get("Domain Scores")) for r in rows],
+        "source": [source] * len(rows),
+        "month": [d.strftime("%Y-%m") if d else "unknown" for d in dates],
+        "risk_band": [r.get("Risk Band") or "unknown" for r in rows],
+    }
+    return pa.table(columns, schema=SCHEMA)
+
+
+def read_new_rows(path, offset):
+    """Yield ``(rows, end_offset)`` batches of complete CSV rows after ``offset``."""
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        if fieldnames != RESULT_FIELDS:
+            raise ValueError(f"{path}: unexpected header {fieldnames}; "
+                             "open it once through results_store to migrate it")
+        offset = max(offset, len(header))
+        fh.seek(offset)
+        pending = b""
+        while True:
+            block = fh.read(CHUNK_BYTES)
+            if not block:
+                return
+            data = pending + block
+            # Only hand over whole lines; a row still being appended waits for
+            # the next run.
+            cut = data.rfind(b"\n") + 1
+            pending = data[cut:]
+            if not cut:
+                continue
+            offset += cut
+            text = data[:cut].decode("utf-8")
+            yield list(csv.DictReader(io.StringIO(text, newline=""), fieldnames=RESULT_FIELDS)), offset
+
+
+# ---------- STATE ----------
+def _load_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(out_dir, state):
+    tmp = os.path.join(out_dir, STATE_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, indent=2)
+    os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+
+
+def _source_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _source_tag(path):
+    """Prefix of a source's Parquet parts: its name plus a hash of its full path,
+    so same-named CSVs in different directories never share (or drop) parts."""
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:10]
+    return f"{_source_name(path)}-{digest}"
+
+
+def _drop_source_parts(out_dir, tag):
+    """Remove the Parquet parts written under ``tag`` (see ``compact``'s basename)."""
+    part = re.compile(re.escape(tag) + r"-[0-9a-f]{8}-\d+-\d+\.parquet")
+    for root, _, files in os.walk(out_dir):
+        for f in files:
+            if part.fullmatch(f):
+                os.remove(os.path.join(root, f))
+
+
+# ---------- COMPACTION ----------
+def compact(sources, out_dir, full=False):
+    """Append rows added to ``sources`` since the last run to ``out_dir``.
+
+    Returns ``{source: rows_written}``.  ``full=True`` rebuilds from scratch.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state = _load_state(out_dir)
+    written = {}
+    for path in sources:
+        key = os.path.abspath(path)
+        tag = _source_tag(path)
+        st = os.stat(path)
+        prev = state.get(key, {})
+        offset = prev.get("offset", 0)
+        if prev and "tag" not in prev:
+            # Exported before part names carried the path hash: redo it under the new tag.
+            _drop_source_parts(out_dir, _source_name(path))
+            offset = 0
+        # The file was replaced (e.g. migrated) or truncated: start it over.
+        if full or prev.get("inode") != st.st_ino or st.st_size < offset:
+            _drop_source_parts(out_dir, tag)
+            offset = 0
+
+        run_id = uuid.uuid4().hex[:8]
+        written[path] = 0
+        for i, (rows, offset) in enumerate(read_new_rows(path, offset)):
+            if rows:
+                ds.write_dataset(
+                    rows_to_table(rows, _source_name(path)), out_dir, format="parquet",
+                    partitioning=PARTITIONING,
+                    basename_template=f"{tag}-{run_id}-{i}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+                written[path] += len(rows)
+            # Checkpoint after every batch so an interrupted run resumes here.
+            state[key] = {"offset": offset, "inode": st.st_ino, "tag": tag}
+            _save_state(out_dir, state)
+        state[key] = {"offset": offset, "inode": st.st_ino, "tag": tag}
+        _save_state(out_dir, state)
+    return written
+
+
+def load_results(out_dir, columns=None, where=None):
+    """Read the compacted dataset as a pandas DataFrame.
+
+    ``where`` is a pyarrow expression, e.g. ``ds.field("risk_band") == "High"``;
+    filters on month / risk_band only touch the matching partitions.
+    """
+    # The state file starts with "_", which the dataset discovery skips.
+    dataset = ds.dataset(out_dir, format="parquet", partitioning=PARTITIONING,
+                         filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True))
+    return dataset.to_table(columns=columns, filter=where).to_pandas(date_as_object=False)
+
+
+# ---------- CLI ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact results CSVs into partitioned Parquet.")
+    parser.add_argument("sources", nargs="*", default=["results.csv", "screening_results.csv"],
+                        help="results CSVs (default: results.csv screening_results.csv)")
+    parser.add_argument("-o", "--output", default="results_parquet", help="output directory")
+    parser.add_argument("--full", action="store_true", help="rebuild instead of appending new rows")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in (s for s in args.sources if os.path.exists(s)):
+        try:
+            n = compact([path], args.output, full=args.full)[path]
+        except ValueError as e:  # e.g. a header not yet migrated to RESULT_FIELDS
+            print(f"skipped {e}", file=sys.stderr)
+            failed = True
+            continue
+        print(f"{path}: {n} new rows")
+    if failed:
+        parser.exit(1)
+
+
+if __name__ == "__main__":
+    main()
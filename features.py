@@ -0,0 +1,94 @@
+"""Feature encoding for the AQ-10 style dataset (train.csv).
+
+train.csv has ten ``A*_Score`` answers, ``age``, a handful of categorical
+columns (with "?" for unknown), an ``ID`` and a ``result`` column.  The
+preprocessor built here:
+
+* ignores ``ID`` and ``result`` -- ``result`` is the screening score the
+  ``Class/ASD`` label was derived from, so training on it leaks the target;
+* treats "?" (and blanks) as missing, imputes and scales the numeric columns;
+* one-hot encodes the categoricals into a sparse matrix; binary yes/no columns
+  collapse to one column, and rare or unseen values (most of the 56 countries)
+  share one "infrequent" column.
+
+It is fitted as the first step of the model pipeline, so it is pickled with the
+model and training and inference always encode the same way.
+"""
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+ID_COLUMN = "ID"
+TARGET_COLUMNS = ["Class/ASD", "Class/ASD Traits "]
+LEAKY_COLUMNS = ["result"]
+SCORE_COLUMNS = [f"A{i}_Score" for i in range(1, 11)]
+NUMERIC_COLUMNS = SCORE_COLUMNS + ["age"]
+CATEGORICAL_COLUMNS = [
+    "gender", "ethnicity", "jaundice", "austim", "contry_of_res",
+    "used_app_before", "age_desc", "relation",
+]
+FEATURE_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
+MISSING = "?"
+
+
+def find_target(data):
+    """Name of the label column in ``data``, or None if it is unlabelled."""
+    for col in TARGET_COLUMNS:
+        if col in data.columns:
+            return col
+    return None
+
+
+def split_target(data):
+    """Split a labelled frame into features and a 0/1 target."""
+    target = find_target(data)
+    if target is None:
+        raise KeyError(f"no target column; expected one of {TARGET_COLUMNS}")
+    y = data[target]
+    if y.dtype == object or str(y.dtype) in ("str", "string"):
+        y = y.astype(str).str.strip().str.upper().isin(["YES", "1"])
+    return data.drop(columns=[target]), y.astype(int)
+
+
+def clean_frame(X):
+    """Normalise raw train.csv values: strip text, turn "?" into missing."""
+    X = X.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in X.columns:
+            X[col] = X[col].astype(object).where(X[col].notna(), np.nan)
+            X[col] = X[col].map(lambda v: v.strip() if isinstance(v, str) else v)
+            X[col] = X[col].replace({MISSING: np.nan, "": np.nan})
+    return X
+
+
+def build_preprocessor(categories="auto", min_frequency=5):
+    """Unfitted preprocessing step producing a sparse feature matrix.
+
+    ``categories`` (a list per categorical column) fixes the one-hot
+    vocabulary up front; streaming training passes the vocabularies it found
+    over the whole file, since the step itself is only fitted on a sample.
+    """
+    numeric = Pipeline([
+        ("impute", SimpleImputer(strategy="median")),
+        ("scale", StandardScaler()),
+    ])
+    categorical = Pipeline([
+        ("impute", SimpleImputer(strategy="constant", fill_value="missing")),
+        ("onehot", OneHotEncoder(categories=categories, drop="if_binary",
+                                 handle_unknown="infrequent_if_exist",
+                                 min_frequency=min_frequency, sparse_output=True)),
+    ])
+    columns = ColumnTransformer(
+        [("num", numeric, NUMERIC_COLUMNS), ("cat", categorical, CATEGORICAL_COLUMNS)],
+        remainder="drop",  # ID, result and anything else never reach the model
+        sparse_threshold=1.0,
+    )
+    return Pipeline([("clean", FunctionTransformer(clean_frame)), ("columns", columns)])
+
+
+def build_pipeline(estimator, **kwargs):
+    """Preprocessor + ``estimator`` as one fit/predict pipeline."""
+    return Pipeline([("prep", build_preprocessor(**kwargs)), ("model", estimator)])
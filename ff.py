@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import os
+from instruments import load_instrument
+from results_store import get_store, make_record
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -34,81 +34,17 @@ age = st.number_input("Age", min_value=1, max_value=100)
 gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
 st.markdown("---")
 
-# ---------- OPTIONS & SCORING ----------
-options = ["Never","Rarely","Sometimes","Often"]
-score_map = {"Never":3, "Rarely":2, "Sometimes":1, "Often":0}  # Correct risk scoring
-
-# ---------- QUESTIONS & SECTIONS WITH EMOJIS ----------
-sections = {
-" Social Relationship & Responsiveness": [
-"1.Child maintains eye contact while talking",
-"2.Child responds to their name",
-"3.Child shows interest in other children",
-"4.Child participates in group play",
-"5.Child understands simple instructions",
-"6.Child expresses emotions appropriately",
-"7.Child can communicate needs",
-"8.Child shows imaginative play",
-"9.Child shares interests with others",
-"10.Child reacts normally to sensory input"
-],
-" Communication": [
-"1.Child can sit calmly when needed",
-"2.Child follows routines easily",
-"3.Child adapts to change",
-"4.Child reacts normally to noise",
-"5.Child reacts normally to touch",
-"6.Child reacts normally to light",
-"7.Child performs age-appropriate learning",
-"8.Child interacts socially",
-"9.Child responds when spoken to",
-"10.Child laughs and smiles appropriately"
-],
-" Emotional Responsiveness": [
-"1.Child uses gestures",
-"2.Child points to express interest",
-"3.Child copies actions",
-"4.Child engages in pretend play",
-"5.Child shows empathy",
-"6.Child understands others’ feelings",
-"7.Child uses appropriate language",
-"8.Child forms sentences",
-"9.Child uses language socially",
-"10.Child initiates conversation"
-],
-" Cognitive Component": [
-"1.Child reacts normally to change",
-"2.Child plays normally with toys",
-"3.Child engages in normal activities",
-"4.Child explores environment normally",
-"5.Child expresses curiosity",
-"6.Child shows appropriate motor skills"
-],
-" Sensory & Motor Behaviours": [
-"1.Child coordinates hand movements",
-"2.Child uses eye-hand coordination well",
-"3.Child imitates actions",
-"4.Child matches patterns",
-"5.Child interacts socially at home",
-"6.Child interacts socially outside"
-],
-" Behaviour Pattern": [
-"1.Child behaves appropriately in groups",
-"2.Child maintains friendships",
-"3.Child behaves appropriately in school",
-"4.Child communicates with teachers",
-"5.Child follows classroom rules",
-"6.Child participates in activities",
-"7.Child displays age-appropriate behaviour",
-"8.Child seeks help when needed"
-]
-}
+# ---------- OPTIONS, SCORING & SECTIONS (definitions/isaa50.json) ----------
+instrument = load_instrument("isaa50")
+options = list(instrument.options)
+score_map = instrument.score_map  # Often = low risk (0), Never = high risk (3)
+sections = instrument.section_dict()
 
 # ---------- SESSION STATE ----------
 if "page" not in st.session_state:
     st.session_state.page = 0
 if "answers" not in st.session_state:
-    st.session_state.answers = [""]*50
+    st.session_state.answers = [""]*len(instrument.items)
 
 section_names = list(sections.keys())
 total_pages = len(section_names)
@@ -146,8 +82,10 @@ def compute_score():
 # ---------- SUBMIT ----------
 if st.session_state.page == total_pages-1:
     if st.button("✔ Submit & View Result"):
+        # pandas loads only once results are shown, not on first paint
+        import pandas as pd
         total_score = compute_score()
-        max_score = 50*3
+        max_score = instrument.questionnaire.max_score
         percent = round((total_score/max_score)*100,2)
 
         st.markdown("---")
@@ -164,15 +102,10 @@ if st.session_state.page == total_pages-1:
 
        
         # ---------- SAVE CSV ----------
-        df = pd.DataFrame({
-            "Name":[name],
-            "Age":[age],
-            "Gender":[gender],
-            "Score":[total_score],
-            "Risk %":[percent],
-            "Date":[datetime.date.today()]
-        })
-        df.to_csv("results.csv", mode="a", header=not os.path.exists("results.csv"), index=False)
+        # one schema and one locked writer for every app (results_store.py)
+        result = instrument.questionnaire.score(st.session_state.answers)
+        get_store("results.csv").append(make_record(name, age, gender, result, instrument="isaa50"),
+                                        answers=st.session_state.answers)
         st.success(" Result saved to CSV")
 
         # ---------- VISUAL OVERALL RISK BAR ----------
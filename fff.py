@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
-import datetime
-import os
+from instruments import load_instrument
+from charts import domain_png
+from reports import get_renderer, render_text, report_filename
+from results_store import get_store, make_record
+from session_store import get_session_store, new_token, valid_token
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -34,183 +36,121 @@ age = st.number_input("Age", min_value=1, max_value=100)
 gender = st.selectbox("Gender", ["Select","Male","Female","Other"])
 st.markdown("---")
 
-# ---------- OPTIONS & SCORING ----------
-options = ["Never","Rarely","Sometimes","Often"]
-score_map = {"Never":3, "Rarely":2, "Sometimes":1, "Often":0}  # Correct risk scoring
-
-# ---------- QUESTIONS & SECTIONS WITH EMOJIS ----------
-sections = {
-"🧩 Social Relationship & Responsiveness": [
-"Child maintains eye contact while talking",
-"Child responds to their name",
-"Child shows interest in other children",
-"Child participates in group play",
-"Child understands simple instructions",
-"Child expresses emotions appropriately",
-"Child can communicate needs",
-"Child shows imaginative play",
-"Child shares interests with others",
-"Child reacts normally to sensory input"
-],
-"🗣 Communication": [
-"Child can sit calmly when needed",
-"Child follows routines easily",
-"Child adapts to change",
-"Child reacts normally to noise",
-"Child reacts normally to touch",
-"Child reacts normally to light",
-"Child performs age-appropriate learning",
-"Child interacts socially",
-"Child responds when spoken to",
-"Child laughs and smiles appropriately"
-],
-"❤️ Emotional Responsiveness": [
-"Child uses gestures",
-"Child points to express interest",
-"Child copies actions",
-"Child engages in pretend play",
-"Child shows empathy",
-"Child understands others’ feelings",
-"Child uses appropriate language",
-"Child forms sentences",
-"Child uses language socially",
-"Child initiates conversation"
-],
-"🧠 Cognitive Component": [
-"Child reacts normally to change",
-"Child plays normally with toys",
-"Child engages in normal activities",
-"Child explores environment normally",
-"Child expresses curiosity",
-"Child shows appropriate motor skills"
-],
-"✋ Sensory & Motor Behaviours": [
-"Child coordinates hand movements",
-"Child uses eye-hand coordination well",
-"Child imitates actions",
-"Child matches patterns",
-"Child interacts socially at home",
-"Child interacts socially outside"
-],
-"👥 Behaviour Pattern": [
-"Child behaves appropriately in groups",
-"Child maintains friendships",
-"Child behaves appropriately in school",
-"Child communicates with teachers",
-"Child follows classroom rules",
-"Child participates in activities",
-"Child displays age-appropriate behaviour",
-"Child seeks help when needed"
-]
-}
+# ---------- QUESTIONNAIRE (definitions/isaa50.json, compiled once per process) ----------
+instrument = load_instrument("isaa50")
+questionnaire = instrument.questionnaire
+options = list(instrument.options)
 
 # ---------- SESSION STATE ----------
-if "page" not in st.session_state:
-    st.session_state.page = 0
-if "answers" not in st.session_state:
-    st.session_state.answers = [""]*50
-
-section_names = list(sections.keys())
-total_pages = len(section_names)
-
-# ---------- DISPLAY PROGRESS ----------
-progress = (st.session_state.page+1)/total_pages
-st.progress(progress)
-st.markdown(f"###  Section {st.session_state.page+1}: {section_names[st.session_state.page]}")
-
-# ---------- DISPLAY QUESTIONS AS CARDS WITH UNIQUE KEYS ----------
-start_index = sum(len(sections[n]) for n in section_names[:st.session_state.page])
-for i, q in enumerate(sections[section_names[st.session_state.page]]):
-    idx = start_index + i
-    st.markdown(f"<div class='card'>{idx+1}. {q}</div>", unsafe_allow_html=True)
-    st.session_state.answers[idx] = st.radio(
-        label="",
-        options=options,
-        index=options.index(st.session_state.answers[idx]) if st.session_state.answers[idx] else None,
-        key=f"q_{idx}"  # <<< UNIQUE KEY FIXED
-    )
-
-# ---------- NAVIGATION ----------
-col1, col2 = st.columns(2)
-with col1:
-    if st.button("⬅ Previous") and st.session_state.page > 0:
-        st.session_state.page -= 1
-with col2:
-    if st.button("Next ➡") and st.session_state.page < total_pages-1:
-        st.session_state.page += 1
+# Page and answers are also saved server-side under the ?resume= token in the
+# URL, so a reconnect (to this or another replica) picks up where it left off.
+sessions = get_session_store()
+if "token" not in st.session_state:
+    token = st.query_params.get("resume")
+    saved = sessions.load(token) if valid_token(token) else None
+    if saved is None:
+        token, saved = new_token(), {"page": 0, "answers": {}}
+        st.query_params["resume"] = token
+    st.session_state.token = token
+    st.session_state.page = saved["page"]
+    st.session_state.answers = [saved["answers"].get(i, "") for i in range(len(questionnaire))]
+
+section_names = [s.title for s in instrument.sections]
+total_pages = questionnaire.n_sections
+
+# ---------- NAVIGATION CALLBACKS ----------
+# Run before the rerun they trigger, so the new page renders straight away.
+def go_to_page(page):
+    st.session_state.page = page
+    sessions.set_page(st.session_state.token, page)
+
+def save_answer(idx):
+    answer = st.session_state[f"q_{idx}"]
+    st.session_state.answers[idx] = answer
+    sessions.set_answer(st.session_state.token, idx, answer)
 
 # ---------- COMPUTE SCORE ----------
 def compute_score():
-    return sum(score_map.get(a,0) for a in st.session_state.answers)
+    return questionnaire.score(st.session_state.answers)
+
+# ---------- SECTION PAGER ----------
+# A fragment: answering or paging reruns only this function, not the header,
+# CSS and participant fields above it.  Submit reruns the whole app.
+@st.fragment
+def section_pager():
+    page = st.session_state.page
+    st.progress((page+1)/total_pages)
+    st.markdown(f"###  Section {page+1}: {section_names[page]}")
+
+    start_index = questionnaire.section_start(page)
+    for i, q in enumerate(instrument.sections[page].items):
+        idx = start_index + i
+        st.markdown(f"<div class='card'>{idx+1}. {q}</div>", unsafe_allow_html=True)
+        st.session_state.answers[idx] = st.radio(
+            label="",
+            options=options,
+            index=options.index(st.session_state.answers[idx]) if st.session_state.answers[idx] else None,
+            key=f"q_{idx}",
+            on_change=save_answer,
+            args=(idx,)
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("⬅ Previous", on_click=go_to_page, args=(page-1,), disabled=page == 0)
+    with col2:
+        st.button("Next ➡", on_click=go_to_page, args=(page+1,), disabled=page == total_pages-1)
+
+    if page == total_pages-1:
+        if st.button("✔ Submit & View Result"):
+            st.session_state.submitted = True
+            st.rerun()  # results render outside the fragment, with the current participant fields
+
+st.caption("Progress is saved as you go - reopen this page's link to resume later.")
+section_pager()
 
 # ---------- SUBMIT ----------
-if st.session_state.page == total_pages-1:
-    if st.button("✔ Submit & View Result"):
-        total_score = compute_score()
-        max_score = 50*3
-        percent = round((total_score/max_score)*100,2)
-
-        st.markdown("---")
-        st.subheader(" Screening Summary")
-        st.write(f"**Total Score:** {total_score} / {max_score}")
-        st.write(f"**Risk Percentage:** {percent}%")
-
-        if percent >= 60:
-            st.error(" High likelihood of autistic traits — professional evaluation recommended.")
-        elif percent >= 40:
-            st.warning(" Moderate likelihood — consider consulting a specialist.")
-        else:
-            st.success(" Low likelihood of autistic traits.")
-
-       
-        # ---------- SAVE CSV ----------
-        df = pd.DataFrame({
-            "Name":[name],
-            "Age":[age],
-            "Gender":[gender],
-            "Score":[total_score],
-            "Risk %":[percent],
-            "Date":[datetime.date.today()]
-        })
-        df.to_csv("results.csv", mode="a", header=not os.path.exists("results.csv"), index=False)
-        st.success(" Result saved to CSV")
-
-        # ---------- VISUAL OVERALL RISK BAR ----------
-        st.markdown("### Overall Autism Risk")
-        st.progress(percent/100)
-
-        # ---------- DOMAIN-WISE BAR CHART USING st.bar_chart ----------
-        domain_scores = []
-        domain_names = []
-        for sec in section_names:
-            idx_start = sum(len(sections[n]) for n in section_names[:section_names.index(sec)])
-            idx_end = idx_start + len(sections[sec])
-            domain_total = sum(score_map.get(a,0) for a in st.session_state.answers[idx_start:idx_end])
-            domain_scores.append(domain_total)
-            domain_names.append(sec)
-        st.markdown("### Domain-wise Scores")
-        domain_df = pd.DataFrame({"Domain":domain_names,"Score":domain_scores})
-        domain_df = domain_df.set_index("Domain")
-        st.bar_chart(domain_df)
-
-        # ---------- DOWNLOAD REPORT ----------
-        report = f"""
-Autism Screening Report (Educational Tool)
-
-Name: {name}
-Age: {age}
-Gender: {gender}
-Date: {datetime.date.today()}
-
-Total Score: {total_score} / {max_score}
-Risk Percentage: {percent}%
-
-Domain Scores:
-"""
-        for sec, s in zip(section_names, domain_scores):
-            report += f"{sec}: {s}\n"
-
-        report += "\nNote: This is NOT a diagnostic assessment."
-        st.download_button("⬇ Download Report", report, file_name=f"{name}_ASD_Report.txt")
-
-        st.balloons()
+if st.session_state.pop("submitted", False):
+    result = compute_score()
+    total_score = result.total
+    max_score = result.max_score
+    percent = result.percent
+
+    st.markdown("---")
+    st.subheader(" Screening Summary")
+    st.write(f"**Total Score:** {total_score} / {max_score}")
+    st.write(f"**Risk Percentage:** {percent}%")
+
+    if result.band == "High":
+        st.error(" High likelihood of autistic traits — professional evaluation recommended.")
+    elif result.band == "Moderate":
+        st.warning(" Moderate likelihood — consider consulting a specialist.")
+    else:
+        st.success(" Low likelihood of autistic traits.")
+
+   
+    # ---------- SAVE CSV ----------
+    record = make_record(name, age, gender, result, instrument="isaa50")
+    get_store("results.csv").append(record, answers=st.session_state.answers)
+    sessions.discard(st.session_state.token)  # submitted: nothing left to resume
+    # Edits after submitting go to a new session, not back into the discarded one.
+    st.session_state.token = new_token()
+    st.query_params["resume"] = st.session_state.token
+    st.success(" Result saved to CSV")
+
+    # ---------- VISUAL OVERALL RISK BAR ----------
+    st.markdown("### Overall Autism Risk")
+    st.progress(percent/100)
+
+    # ---------- DOMAIN-WISE BAR CHART ----------
+    # the same image goes into the PDF report, so it is drawn once per result
+    st.markdown("### Domain-wise Scores")
+    st.image(domain_png(result.domains))
+
+    # ---------- DOWNLOAD REPORT ----------
+    pdf = get_renderer().submit(record)
+    st.download_button("⬇ Download Report", render_text(record), file_name=report_filename(record, "txt"))
+    st.download_button("⬇ Download PDF Report", pdf.result, file_name=report_filename(record),
+                       mime="application/pdf", on_click="ignore")
+
+    st.balloons()
@@ -0,0 +1,161 @@
+"""Questionnaire definitions, loaded from versioned JSON files.
+
+Each instrument lives in ``definitions/<id>.json``: its version, answer
+options, option -> points map, risk bands and sections of items, plus an
+optional title and markdown description.  A variant can ``"extends"`` another
+file and override only what differs (keys are replaced whole); inside its
+sections an integer item means "item number N of the parent", so regrouped
+variants don't copy the wording:
+
+    {"id": "isaa50-5section", "version": "1.0.0", "extends": "isaa50",
+     "options": [...], "scores": {...},
+     "sections": [{"name": "Communication", "items": [1, 2, 3, ...]}, ...]}
+
+:func:`load_instrument` parses, validates and compiles a definition once per
+process (scoring.py's integer-coded :class:`Questionnaire`) and returns the
+same immutable :class:`Instrument` to every caller afterwards.  Edit the JSON
+and restart the app to pick up a change.
+"""
+
+import functools
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from scoring import Questionnaire, compile_questionnaire
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "definitions")
+BAND_TARGETS = ("percent", "total")
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    icon: str
+    items: tuple
+
+    @property
+    def title(self):
+        """Display name, with the icon in front when there is one."""
+        return f"{self.icon} {self.name}" if self.icon else self.name
+
+
+@dataclass(frozen=True, eq=False)
+class Instrument:
+    id: str
+    version: str
+    title: str
+    options: tuple
+    scores: MappingProxyType  # option -> points
+    sections: tuple
+    bands: tuple              # ((lower bound, label), ...) ascending
+    band_on: str
+    questionnaire: Questionnaire
+    description: str = ""     # optional markdown shown above the questions
+
+    @property
+    def items(self):
+        return self.questionnaire.items
+
+    @property
+    def score_map(self):
+        return dict(self.scores)
+
+    def section_dict(self, icons=False):
+        """``{section: [items]}`` as the apps used to write it by hand."""
+        return {(s.title if icons else s.name): list(s.items) for s in self.sections}
+
+    def __repr__(self):
+        return f"Instrument({self.id!r} v{self.version}, {len(self.items)} items, {len(self.sections)} sections)"
+
+
+# ---------- PARSING ----------
+def _definition_path(instrument_id):
+    return os.path.join(DEFINITIONS_DIR, f"{instrument_id}.json")
+
+
+def _read(instrument_id, seen=()):
+    """The definition as a plain dict, with ``extends`` resolved."""
+    if instrument_id in seen:
+        raise ValueError(f"circular 'extends': {' -> '.join(seen + (instrument_id,))}")
+    path = _definition_path(instrument_id)
+    with open(path, encoding="utf-8") as fh:
+        spec = json.load(fh)
+    if spec.get("id") != instrument_id:
+        raise ValueError(f"{path}: id {spec.get('id')!r} does not match the file name")
+
+    parent_id = spec.pop("extends", None)
+    if parent_id is None:
+        return spec
+    parent = _read(parent_id, seen + (instrument_id,))
+    parent_items = [q for s in parent["sections"] for q in s["items"]]
+    merged = {**parent, **spec}
+    if "sections" in spec:
+        merged["sections"] = []
+        for section in spec["sections"]:
+            items = []
+            for q in section["items"]:
+                if isinstance(q, int):
+                    if not 1 <= q <= len(parent_items):
+                        raise ValueError(f"{path}: item {q} is not in {parent_id!r}")
+                    q = parent_items[q - 1]
+                items.append(q)
+            merged["sections"].append({**section, "items": items})
+    return merged
+
+
+def _validate(spec, instrument_id):
+    where = _definition_path(instrument_id)
+    for key in ("version", "options", "scores", "bands", "sections"):
+        if key not in spec:
+            raise ValueError(f"{where}: missing {key!r}")
+    options = spec["options"]
+    if not options or len(set(options)) != len(options):
+        raise ValueError(f"{where}: options must be a non-empty list of distinct labels")
+    unknown = set(spec["scores"]) - set(options)
+    if unknown:
+        raise ValueError(f"{where}: scores for unknown options {sorted(unknown)}")
+    if any(not isinstance(p, int) for p in spec["scores"].values()):
+        raise ValueError(f"{where}: scores must be integers")
+    if spec.get("band_on", "percent") not in BAND_TARGETS:
+        raise ValueError(f"{where}: band_on must be one of {BAND_TARGETS}")
+    bounds = [b for b, _ in spec["bands"]]
+    if bounds != sorted(bounds) or len(set(bounds)) != len(bounds):
+        raise ValueError(f"{where}: band bounds must be strictly ascending")
+    for section in spec["sections"]:
+        if not section.get("name") or not section.get("items"):
+            raise ValueError(f"{where}: every section needs a name and items")
+        if any(not isinstance(q, str) for q in section["items"]):
+            raise ValueError(f"{where}: section {section['name']!r} has non-text items")
+
+
+# ---------- LOADING ----------
+@functools.lru_cache(maxsize=None)
+def load_instrument(instrument_id):
+    """The compiled, immutable :class:`Instrument` for ``definitions/<instrument_id>.json``."""
+    spec = _read(instrument_id)
+    _validate(spec, instrument_id)
+    sections = tuple(Section(s["name"], s.get("icon", ""), tuple(s["items"])) for s in spec["sections"])
+    bands = tuple((b, label) for b, label in spec["bands"])
+    band_on = spec.get("band_on", "percent")
+    return Instrument(
+        id=instrument_id,
+        version=spec["version"],
+        title=spec.get("title", instrument_id),
+        options=tuple(spec["options"]),
+        scores=MappingProxyType(dict(spec["scores"])),
+        sections=sections,
+        bands=bands,
+        band_on=band_on,
+        questionnaire=compile_questionnaire(
+            {s.name: list(s.items) for s in sections}, spec["scores"], spec["options"],
+            bands=bands, band_on=band_on),
+        description=spec.get("description", ""),
+    )
+
+
+def available_instruments():
+    """Ids of every definition file, sorted."""
+    return sorted(name[:-len(".json")] for name in os.listdir(DEFINITIONS_DIR)
+                  if name.endswith(".json"))
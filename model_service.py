@@ -0,0 +1,93 @@
+"""Model artifacts and cached prediction for the ASD model used by code.py.
+
+Training is an explicit step: ``calibration.train_calibrated`` fits the
+calibrated classifier and tunes its triage thresholds, then :func:`save_artifact`
+writes a versioned artifact to ``models/`` and points ``model.pkl`` at it.
+Prediction never refits: :func:`load_model` unpickles ``model.pkl`` once per process and
+only reloads it when the file's mtime changes (i.e. after a new training run).
+A ``.npz`` path is read with compact_model instead, which needs neither
+sklearn nor joblib; both are imported only when actually used here.
+"""
+
+import os
+import shutil
+import threading
+
+import numpy as np
+
+MODEL_PATH = "model.pkl"
+MODEL_DIR = "models"
+LOW_RISK, REVIEW, HIGH_RISK = "Low risk", "Review", "High risk"
+
+
+# ---------- SAVING ----------
+def save_artifact(artifact, model_path=MODEL_PATH, model_dir=MODEL_DIR):
+    """Write ``models/model-<version>.pkl`` and atomically repoint ``model_path``."""
+    import joblib
+
+    os.makedirs(model_dir, exist_ok=True)
+    versioned = os.path.join(model_dir, f"model-{artifact['version']}.pkl")
+    joblib.dump(artifact, versioned)
+    tmp = model_path + ".tmp"
+    shutil.copyfile(versioned, tmp)
+    os.replace(tmp, model_path)
+    return versioned
+
+
+# ---------- CACHED LOADING ----------
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_model(model_path=MODEL_PATH):
+    """Return the artifact at ``model_path``, reloading only if the file changed.
+
+    Returns None when no model has been trained yet.
+    """
+    try:
+        st = os.stat(model_path)
+    except FileNotFoundError:
+        return None
+    key = os.path.abspath(model_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        if model_path.endswith(".npz"):
+            from compact_model import load_compact
+            artifact = load_compact(model_path)
+        else:
+            import joblib
+            artifact = joblib.load(model_path)
+        _cache[key] = (stamp, artifact)
+        return artifact
+
+
+def predict(data, model_path=MODEL_PATH):
+    """Predict classes for ``data`` with the saved model (no retraining)."""
+    artifact = load_model(model_path)
+    if artifact is None:
+        raise FileNotFoundError(f"no trained model at {model_path!r}; train one first")
+    return artifact["model"].predict(data[artifact["features"]])
+
+
+def predict_proba(data, model_path=MODEL_PATH):
+    """Probability of ASD for each row of ``data`` with the saved model."""
+    artifact = load_model(model_path)
+    if artifact is None:
+        raise FileNotFoundError(f"no trained model at {model_path!r}; train one first")
+    return artifact["model"].predict_proba(data[artifact["features"]])[:, 1]
+
+
+def triage(proba, thresholds):
+    """Map probabilities to Low risk / Review / High risk.
+
+    ``thresholds`` is the ``{"low": ..., "high": ...}`` dict calibration.py
+    stores in the artifact.
+    """
+    proba = np.asarray(proba)
+    labels = np.full(proba.shape, REVIEW, dtype=object)
+    labels[proba < thresholds["low"]] = LOW_RISK
+    labels[proba >= thresholds["high"]] = HIGH_RISK
+    return labels
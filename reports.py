@@ -0,0 +1,435 @@
+"""Screening reports: one template, rendered as text, HTML or PDF.
+
+A report is filled from a ``RESULT_FIELDS`` record (what ``make_record``
+builds and the results store keeps), so the apps, the HTTP API and the bulk
+export all print the same thing: participant header, total and percent, risk
+band, a per-domain table, the domain bar chart and the disclaimer.
+
+The domain chart is rasterised once per result (charts.domain_png, cached on
+the domain scores) and the same PNG is shown on screen, embedded in the PDF
+and inlined in the HTML:
+
+    st.image(domain_png(result.domains))
+    st.download_button("Report", render_text(record), file_name=report_filename(record, "txt"))
+    future = get_renderer().submit(record)   # PDF, rendering starts right away
+    st.download_button("PDF", future.result, file_name=report_filename(record), on_click="ignore")
+
+PDFs render into memory on a small thread pool (``ASD_REPORT_WORKERS``,
+default 2) and are cached by a hash of their content.  Large exports, such as
+a quarter's screenings for an audit, are spread over a process pool and
+streamed into a zip:
+
+    python reports.py 2026-10-18 -o day.pdf                    # one multi-page PDF
+    python reports.py 2026-07-01 --to 2026-09-30 --zip -j 8    # one PDF per screening
+    python reports.py 2026-07-01 --to 2026-09-30 --zip --format html
+"""
+
+import argparse
+import base64
+import csv
+import datetime
+import functools
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import string
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from charts import domain_png
+from instruments import available_instruments, load_instrument
+from results_store import LEGACY_COLUMNS, RESULT_FIELDS, RESULTS_BACKEND, locked_csv
+
+REPORT_WORKERS = int(os.environ.get("ASD_REPORT_WORKERS", "2"))
+CACHE_SIZE = 256
+FORMATS = ("pdf", "html", "txt")
+TITLE = "Autism Screening Report (Educational Tool)"
+DISCLAIMER = ("Note: This is NOT a diagnostic assessment. It is a screening aid for "
+              "educational purposes; please consult a qualified professional.")
+
+
+# ---------- CONTEXT ----------
+def report_context(record):
+    """The values a report template is filled with."""
+    domains = record.get("Domain Scores") or {}
+    if isinstance(domains, str):
+        domains = json.loads(domains)
+    instrument = record.get("Instrument") or ""
+    return {
+        "title": TITLE,
+        "instrument": instrument,
+        "instrument_title": _instrument_title(instrument),
+        "name": record.get("Name", ""),
+        "age": record.get("Age", ""),
+        "gender": record.get("Gender", ""),
+        "date": record.get("Date", ""),
+        "score": record.get("Score", ""),
+        "max_score": record.get("Max Score", ""),
+        "percent": record.get("Risk %", ""),
+        "band": record.get("Risk Band", ""),
+        "domains": {d: int(s) for d, s in domains.items()},
+        "disclaimer": DISCLAIMER,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _instrument_title(instrument_id):
+    if instrument_id in available_instruments():
+        return load_instrument(instrument_id).title
+    return instrument_id
+
+
+def report_key(record, fmt="pdf"):
+    """Content hash of the fields a report prints."""
+    row = {f: record.get(f, "") for f in RESULT_FIELDS}
+    payload = json.dumps([fmt, row], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def report_filename(record, fmt="pdf"):
+    """``<name>_ASD_Report.<fmt>`` with the name reduced to filename-safe characters."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(record.get("Name") or "")).strip("._") or "screening"
+    return f"{name}_ASD_Report.{fmt}"
+
+
+# ---------- TEMPLATES ----------
+TEXT_TEMPLATE = string.Template("""\
+$title
+
+Name: $name
+Age: $age
+Gender: $gender
+Date: $date
+Instrument: $instrument_title
+
+Total Score: $score / $max_score
+Risk Percentage: $percent%
+Risk Band: $band
+
+Domain Scores:
+$domain_lines
+
+$disclaimer
+""")
+
+HTML_TEMPLATE = string.Template("""\
+<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>$title - $name</title>
+<style>
+body {font-family: Helvetica, Arial, sans-serif; max-width: 720px; margin: 2em auto; color: #222;}
+h1 {color: #6C63FF; font-size: 1.5em;} table {border-collapse: collapse; margin: 1em 0;}
+td, th {padding: 4px 12px; text-align: left; border-bottom: 1px solid #ddd;}
+.band {font-weight: bold;} .note {color: #666; font-size: 0.9em;}
+</style></head><body>
+<h1>$title</h1>
+<p>$instrument_title</p>
+<table>
+<tr><th>Name</th><td>$name</td><th>Date</th><td>$date</td></tr>
+<tr><th>Age</th><td>$age</td><th>Gender</th><td>$gender</td></tr>
+</table>
+<p>Total Score: <b>$score / $max_score</b> &middot; Risk Percentage: <b>$percent%</b>
+&middot; Risk Band: <span class="band">$band</span></p>
+<table><tr><th>Domain</th><th>Score</th></tr>
+$domain_rows
+</table>
+<img alt="Domain-wise scores" src="data:image/png;base64,$chart">
+<p class="note">$disclaimer</p>
+</body></html>
+""")
+
+
+def render_text(record):
+    ctx = report_context(record)
+    ctx["domain_lines"] = "\n".join(f"{d}: {s}" for d, s in ctx["domains"].items())
+    return TEXT_TEMPLATE.substitute(ctx)
+
+
+def render_html(record):
+    ctx = report_context(record)
+    chart = base64.b64encode(domain_png(ctx["domains"])).decode("ascii") if ctx["domains"] else ""
+    safe = {k: html.escape(str(v)) for k, v in ctx.items() if k != "domains"}
+    safe["domain_rows"] = "\n".join(f"<tr><td>{html.escape(d)}</td><td>{s}</td></tr>"
+                                    for d, s in ctx["domains"].items())
+    safe["chart"] = chart
+    return HTML_TEMPLATE.substitute(safe)
+
+
+def _draw_pdf_page(c, pagesize, ctx, image_reader):
+    """Lay one report out on reportlab canvas ``c`` of ``pagesize`` (points)."""
+    width, height = pagesize
+    left, y = 72, height - 72
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(left, y, ctx["title"])
+    c.setFont("Helvetica", 10)
+    c.drawString(left, y - 16, ctx["instrument_title"])
+
+    y -= 48
+    c.setFont("Helvetica", 11)
+    for (label, value), (label2, value2) in (
+            (("Name", ctx["name"]), ("Date", ctx["date"])),
+            (("Age", ctx["age"]), ("Gender", ctx["gender"]))):
+        c.drawString(left, y, f"{label}: {value}")
+        c.drawString(left + 260, y, f"{label2}: {value2}")
+        y -= 16
+
+    y -= 12
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(left, y, f"Total Score: {ctx['score']} / {ctx['max_score']}")
+    c.drawString(left + 200, y, f"Risk: {ctx['percent']}%")
+    c.drawString(left + 320, y, f"Band: {ctx['band']}")
+
+    if ctx["domains"]:
+        y -= 30
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(left, y, "Domain")
+        c.drawRightString(left + 400, y, "Score")
+        c.line(left, y - 4, left + 400, y - 4)
+        c.setFont("Helvetica", 11)
+        for domain, score in ctx["domains"].items():
+            y -= 16
+            c.drawString(left, y, domain)
+            c.drawRightString(left + 400, y, str(score))
+
+        img_w, img_h = image_reader.getSize()
+        # full text width, shrunk if needed to stay clear of the disclaimer
+        draw_w = min(width - 2 * left, (y - 100) * img_w / img_h)
+        draw_h = draw_w * img_h / img_w
+        y -= draw_h + 20
+        c.drawImage(image_reader, left, y, width=draw_w, height=draw_h)
+
+    c.setFont("Helvetica-Oblique", 9)
+    text = c.beginText(left, 60)
+    for line in _wrap(ctx["disclaimer"], 100):
+        text.textLine(line)
+    c.drawText(text)
+
+
+def _wrap(text, width):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line]
+
+
+@functools.lru_cache(maxsize=None)
+def _configure_reportlab():
+    """Set reportlab up for reports, once per process (on the first PDF)."""
+    from reportlab import rl_config
+
+    # Binary streams: reportlab's ASCII85 encoding is pure Python and was half
+    # the PDF time once the chart is cached.  rl_config is process-wide and
+    # reportlab reads it while a PDF is saved, so it is set here once rather
+    # than toggled per render (renders run on several threads).  Other PDFs
+    # made in this process are only affected in being 8-bit streams, which
+    # every PDF reader accepts.
+    rl_config.useA85 = 0
+
+
+def render_pdf(records):
+    """PDF bytes with one page per record (a single record is fine too)."""
+    # reportlab loads on the first report, not when an app imports this module
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    _configure_reportlab()
+    if isinstance(records, dict):
+        records = [records]
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    c.setTitle(TITLE)
+    for record in records:
+        ctx = report_context(record)
+        chart = ImageReader(io.BytesIO(domain_png(ctx["domains"]))) if ctx["domains"] else None
+        _draw_pdf_page(c, letter, ctx, chart)
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+RENDERERS = {"pdf": render_pdf, "html": render_html, "txt": render_text}
+
+
+def render(record, fmt="pdf"):
+    """One report as bytes in ``fmt`` (one of ``FORMATS``)."""
+    out = RENDERERS[fmt](record)
+    return out.encode("utf-8") if isinstance(out, str) else out
+
+
+# ---------- POOL & CACHE ----------
+class ReportRenderer:
+    """Bounded thread pool plus an LRU cache of rendered reports."""
+
+    def __init__(self, workers=REPORT_WORKERS, cache_size=CACHE_SIZE):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self._cache = OrderedDict()  # content hash -> Future holding the report bytes
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def submit(self, record, fmt="pdf"):
+        """Future for the report of ``record``; identical records share one render."""
+        key = report_key(record, fmt)
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self._cache.move_to_end(key)
+                return future
+            future = self._cache[key] = self._pool.submit(render, record, fmt)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        future.add_done_callback(lambda f: self._forget_failed(key, f))
+        return future
+
+    def _forget_failed(self, key, future):
+        if future.exception() is None:
+            return
+        with self._lock:  # failed renders are retried next time, not cached
+            if self._cache.get(key) is future:
+                del self._cache[key]
+
+    def pdf(self, record):
+        return self.submit(record).result()
+
+    def zip(self, records, fmt="pdf"):
+        """Zip bytes holding one report per record, rendered on the pool."""
+        futures = [(record, self.submit(record, fmt)) for record in records]
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            names = _unique_names()
+            for record, future in futures:
+                zf.writestr(names(report_filename(record, fmt)), future.result())
+        return buf.getvalue()
+
+    def bulk_pdf(self, records):
+        """One multi-page PDF for all ``records``, rendered off the caller's thread."""
+        return self._pool.submit(render_pdf, list(records)).result()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def _unique_names():
+    """Callable that suffixes repeated file names: a.pdf, a_2.pdf, ..."""
+    seen = {}
+
+    def unique(name):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] == 1:
+            return name
+        stem, ext = os.path.splitext(name)
+        return f"{stem}_{seen[name]}{ext}"
+    return unique
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Return the process-wide :class:`ReportRenderer`."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ReportRenderer()
+        return _renderer
+
+
+# ---------- BULK EXPORT ----------
+def _render_chunk(records, fmt):
+    return [(report_filename(r, fmt), render(r, fmt)) for r in records]
+
+
+def write_archive(records, fileobj, fmt="pdf", processes=None, chunk_size=64):
+    """Stream one report per record into a zip on ``fileobj``; returns the count.
+
+    Chunks of records render on a process pool (``processes``, default all
+    cores) and are written in input order.  At most two chunks per process
+    are in flight, so memory stays bounded by those rather than the whole
+    export.
+    """
+    processes = processes or os.cpu_count() or 1
+    chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+    names = _unique_names()
+
+    def write(files):
+        for name, data in files:
+            zf.writestr(names(name), data)
+
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_STORED if fmt == "pdf" else zipfile.ZIP_DEFLATED) as zf:
+        if processes == 1:
+            for chunk in chunks:
+                write(_render_chunk(chunk, fmt))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_render_chunk, chunk, fmt))
+                    if len(pending) >= 2 * processes:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    return len(records)
+
+
+def records_between(start, end, path="results.csv"):
+    """Stored ``RESULT_FIELDS`` records screened ``start`` .. ``end`` (ISO dates, inclusive).
+
+    The CSV is read as it is on disk, under the shared lock, so rows a running
+    app has not flushed yet (a few seconds' worth) are not included.
+    """
+    start, end = str(start), str(end)
+    if RESULTS_BACKEND == "sqlite":
+        from results_db import get_db
+        store = get_db()
+        return [{
+            "Name": r["name"], "Age": r["age"], "Gender": r["gender"], "Score": r["score"],
+            "Risk %": r["percent"], "Date": r["screened_on"], "Max Score": r["max_score"],
+            "Risk Band": r["risk_band"], "Instrument": r["instrument"],
+            "Domain Scores": json.dumps(store.domain_scores(r["id"]), ensure_ascii=False),
+        } for r in reversed(store.screenings_between(start, end))]
+    try:
+        with locked_csv(path, "r", shared=True) as fh:
+            rows = [{LEGACY_COLUMNS.get(k, k): v for k, v in row.items()} for row in csv.DictReader(fh)]
+    except FileNotFoundError:
+        return []
+    return [row for row in rows if start <= (row.get("Date") or "") <= end]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render stored screenings as reports.")
+    parser.add_argument("day", nargs="?", default=datetime.date.today().isoformat(),
+                        help="ISO date, or the first day with --to (default today)")
+    parser.add_argument("--to", help="last ISO date of the range (default: same day)")
+    parser.add_argument("--results", default="results.csv", help="results CSV (CSV backend)")
+    parser.add_argument("--zip", action="store_true", help="one report per screening, zipped")
+    parser.add_argument("--format", choices=FORMATS, default="pdf", help="report format inside the zip")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="render processes for --zip (default: all cores)")
+    parser.add_argument("-o", "--output", help="output file (default reports-<day>.pdf/.zip)")
+    args = parser.parse_args(argv)
+
+    records = records_between(args.day, args.to or args.day, args.results)
+    if not records:
+        parser.exit(1, f"no screenings from {args.day} to {args.to or args.day}\n")
+    span = f"{args.day}_{args.to}" if args.to else args.day
+    output = args.output or f"reports-{span}.{'zip' if args.zip else 'pdf'}"
+    with open(output, "wb") as fh:
+        if args.zip:
+            write_archive(records, fh, args.format, args.processes)
+        else:
+            fh.write(render_pdf(records))
+    print(f"{len(records)} reports -> {output} ({os.path.getsize(output) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
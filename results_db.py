@@ -0,0 +1,190 @@
+"""SQLite storage backend for screening results.
+
+Enable it for the apps with ``ASD_RESULTS_BACKEND=sqlite`` (database path from
+``ASD_RESULTS_DB``, default screenings.db).  Each screening is one row in
+``screenings`` with its per-item answers and domain scores in side tables.
+The database runs in WAL mode and is indexed on date, risk band and age, so
+dashboard queries are index range scans instead of full CSV parses, and the
+cohort rollups (rollups.py) are kept in the same database:
+
+    db = get_db()
+    db.screenings_between("2026-10-01", "2026-10-31", band="High")
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+from rollups import Rollups
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenings (
+    id          INTEGER PRIMARY KEY,
+    created_at  TEXT    NOT NULL,
+    screened_on TEXT    NOT NULL,
+    instrument  TEXT    NOT NULL DEFAULT '',
+    name        TEXT,
+    age         INTEGER,
+    gender      TEXT,
+    score       INTEGER NOT NULL,
+    max_score   INTEGER,
+    percent     REAL    NOT NULL,
+    risk_band   TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS screening_answers (
+    screening_id INTEGER NOT NULL REFERENCES screenings(id) ON DELETE CASCADE,
+    item         INTEGER NOT NULL,
+    answer       TEXT,
+    PRIMARY KEY (screening_id, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS screening_domains (
+    screening_id INTEGER NOT NULL REFERENCES screenings(id) ON DELETE CASCADE,
+    domain       TEXT    NOT NULL,
+    score        INTEGER NOT NULL,
+    PRIMARY KEY (screening_id, domain)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_screenings_date ON screenings (screened_on);
+CREATE INDEX IF NOT EXISTS idx_screenings_band_date ON screenings (risk_band, screened_on);
+CREATE INDEX IF NOT EXISTS idx_screenings_age ON screenings (age);
+"""
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsDB:
+    """Screening results in a local SQLite database.
+
+    ``append`` takes the same ``RESULT_FIELDS`` record as
+    :class:`results_store.ResultsStore`, so the apps can write to either.
+    """
+
+    def __init__(self, path="screenings.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        # Streamlit serves sessions from many threads; the lock serialises them.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+        # Cohort rollups share this database and lock: they commit with each insert.
+        self.rollups = Rollups(self._conn, self._lock)
+        self.rollups.sync_screenings()  # catch up with rows stored before the rollups existed
+
+    # ---------- WRITES ----------
+    def append(self, record, answers=None):
+        """Insert one screening and return its id."""
+        return self.append_many([record], None if answers is None else [answers])[0]
+
+    def append_many(self, records, answers=None):
+        """Insert several screenings in one transaction and return their ids.
+
+        ``answers``, if given, holds one per-item answer list per record.
+        """
+        if answers is None:
+            answers = [None] * len(records)
+        with self._lock, self._conn:
+            ids = [self._insert(record, items) for record, items in zip(records, answers)]
+            self.rollups.fold_screenings()
+            return ids
+
+    def _insert(self, record, answers):
+        domains = record.get("Domain Scores") or {}
+        if isinstance(domains, str):
+            domains = json.loads(domains)
+        screened_on = record.get("Date") or datetime.date.today().isoformat()
+        cur = self._conn.execute(
+            "INSERT INTO screenings (created_at, screened_on, instrument, name, age, gender,"
+            " score, max_score, percent, risk_band) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.datetime.now().isoformat(timespec="seconds"),
+                str(screened_on),
+                record.get("Instrument", ""),
+                record.get("Name"),
+                _int_or_none(record.get("Age")),
+                record.get("Gender"),
+                int(record["Score"]),
+                _int_or_none(record.get("Max Score")),
+                float(record["Risk %"]),
+                record["Risk Band"],
+            ),
+        )
+        screening_id = cur.lastrowid
+        if answers is not None:
+            self._conn.executemany(
+                "INSERT INTO screening_answers VALUES (?, ?, ?)",
+                [(screening_id, i, a) for i, a in enumerate(answers, start=1)],
+            )
+        self._conn.executemany(
+            "INSERT INTO screening_domains VALUES (?, ?, ?)",
+            [(screening_id, d, int(s)) for d, s in domains.items()],
+        )
+        return screening_id
+
+    def flush(self):
+        """Rows are committed on ``append``; kept for parity with ResultsStore."""
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- QUERIES ----------
+    def screenings_between(self, start, end, band=None):
+        """Screenings dated ``start`` .. ``end`` (inclusive, ISO dates), newest first."""
+        sql = "SELECT * FROM screenings WHERE screened_on BETWEEN ? AND ?"
+        params = [str(start), str(end)]
+        if band is not None:
+            sql += " AND risk_band = ?"
+            params.append(band)
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql + " ORDER BY screened_on DESC", params)]
+
+    def count_by_band(self, start, end):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT risk_band, COUNT(*) FROM screenings"
+                " WHERE screened_on BETWEEN ? AND ? GROUP BY risk_band",
+                (str(start), str(end)),
+            )
+            return dict(rows.fetchall())
+
+    def answers(self, screening_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT answer FROM screening_answers WHERE screening_id = ? ORDER BY item",
+                (screening_id,),
+            )
+            return [r[0] for r in rows]
+
+    def domain_scores(self, screening_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT domain, score FROM screening_domains WHERE screening_id = ?",
+                (screening_id,),
+            )
+            return dict(rows.fetchall())
+
+
+# ---------- SHARED DATABASE ----------
+_dbs = {}
+_dbs_lock = threading.Lock()
+
+
+def get_db(path=None):
+    """Return the process-wide :class:`ResultsDB` for ``path``."""
+    path = path or os.environ.get("ASD_RESULTS_DB", "screenings.db")
+    key = os.path.abspath(path)
+    with _dbs_lock:
+        db = _dbs.get(key)
+        if db is None:
+            db = _dbs[key] = ResultsDB(path)
+        return db
@@ -0,0 +1,296 @@
+"""Append-only store for screening results.
+
+All apps write the same columns (``RESULT_FIELDS``) to results.csv /
+screening_results.csv through a shared :class:`ResultsStore`:
+
+* every ``append`` goes to a write-ahead file and is fsync'd before it returns,
+  so an acknowledged result survives a crash;
+* rows are buffered and written to the CSV in one batch when the buffer is full
+  or every few seconds, under a thread lock plus an OS file lock, so concurrent
+  Streamlit sessions (and replicas) never interleave half-written rows;
+* each store holds an OS lock on its write-ahead file while it lives; on
+  start-up any write-ahead file nobody holds (its process died) is claimed and
+  replayed, one process at a time;
+* each flush folds the new rows into the cohort rollups (rollups.py).
+
+Set ``ASD_RESULTS_BACKEND=sqlite`` to have :func:`get_store` hand out the
+SQLite backend from results_db.py instead.
+"""
+
+import atexit
+import contextlib
+import csv
+import datetime
+import glob
+import json
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: the thread lock still covers a single process
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+RESULTS_BACKEND = os.environ.get("ASD_RESULTS_BACKEND", "csv")
+
+RESULT_FIELDS = [
+    "Name", "Age", "Gender", "Score", "Risk %", "Date",
+    "Max Score", "Risk Band", "Instrument", "Domain Scores",
+]
+
+# Column names used by the older apps before they shared a schema.
+LEGACY_COLUMNS = {
+    "Risk Score": "Score",
+    "Total Score": "Score",
+    "Risk": "Risk Band",
+}
+
+
+def make_record(name, age, gender, result, instrument, date=None):
+    """Build a ``RESULT_FIELDS`` row from a :class:`scoring.Score`."""
+    return {
+        "Name": name,
+        "Age": age,
+        "Gender": gender,
+        "Score": result.total,
+        "Risk %": result.percent,
+        "Date": (date or datetime.date.today()).isoformat(),
+        "Max Score": result.max_score,
+        "Risk Band": result.band,
+        "Instrument": instrument,
+        "Domain Scores": json.dumps(result.domains, ensure_ascii=False),
+    }
+
+
+@contextlib.contextmanager
+def locked_csv(path, mode="a", shared=False):
+    """Open the results CSV at ``path`` under an OS lock, closed on exit.
+
+    Writers take the lock exclusively, readers ``shared``.  A CSV replaced
+    while we waited (header migration) is reopened, so nothing is ever
+    written to or read from the old file.
+    """
+    while True:
+        fh = open(path, mode, newline="", encoding="utf-8")
+        if fcntl is None:
+            break
+        fcntl.flock(fh, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            if os.fstat(fh.fileno()).st_ino == os.stat(path).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        fh.close()
+    with fh:  # closing releases the lock
+        yield fh
+
+
+def _try_lock(fh):
+    """Lock a write-ahead file for this process; False if its store is alive."""
+    if fcntl is None:
+        return True  # no OS locks: only this process writes (see the import)
+    try:
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class ResultsStore:
+    """Buffered, lock-protected CSV appender with a write-ahead file."""
+
+    def __init__(self, path, flush_rows=50, flush_seconds=2.0):
+        self.path = os.path.abspath(path)  # stays valid if the cwd changes
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        # One write-ahead file per store, so replicas never truncate each
+        # other's un-flushed rows.  The pid in the name is only for people.
+        self.wal_path = f"{self.path}.{os.getpid()}-{id(self):x}.wal"
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._closed = False
+
+        with self._lock:
+            with locked_csv(self.path, "a+") as fh:
+                self._migrate_header(fh)
+            # Recovery and creating our own (locked) write-ahead file happen under
+            # one CSV lock, so no other store can mistake the new file for a dead one.
+            with locked_csv(self.path, "a+") as fh:
+                self._recover(fh)
+                self._wal = open(self.wal_path, "a", encoding="utf-8")
+                _try_lock(self._wal)
+        # Resolved now rather than at the first flush, which may run at interpreter
+        # exit (close_all) when the import would no longer work.
+        from rollups import get_rollups, rollups_path  # rollups imports this module
+        self._rollups = get_rollups(rollups_path(os.path.dirname(self.path)))
+
+        self._stop = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically,
+                                       name=f"results-flush:{path}", daemon=True)
+        self._timer.start()
+
+    # ---------- PUBLIC ----------
+    def append(self, record, answers=None):
+        """Durably record one result; it reaches the CSV on the next flush.
+
+        Per-item ``answers`` are only kept by the SQLite backend.
+        """
+        self.append_many([record])
+
+    def append_many(self, records, answers=None):
+        """Durably record several results with a single fsync."""
+        rows = [{f: record.get(f, "") for f in RESULT_FIELDS} for record in records]
+        lines = "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows)
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"results store {self.path!r} is closed")
+            self._wal.write(lines)
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._buffer.extend(rows)
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            os.remove(self.wal_path)  # before the close drops its lock
+            self._wal.close()
+
+    # ---------- INTERNALS ----------
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    @staticmethod
+    def _write_rows(fh, rows):
+        """Append rows to the CSV open (and locked) as ``fh``, and fsync."""
+        writer = csv.DictWriter(fh, fieldnames=RESULT_FIELDS)
+        if fh.seek(0, os.SEEK_END) == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        with locked_csv(self.path) as fh:
+            self._write_rows(fh, self._buffer)
+        self._buffer = []
+        # Everything in the WAL is now in the CSV.
+        self._wal.truncate(0)
+        self._wal.seek(0)
+        self._update_rollups()
+
+    def _update_rollups(self):
+        """Fold the rows just written into the cohort rollups (see ``rollups_path``)."""
+        try:
+            self._rollups.sync_csv(self.path)
+        except Exception:
+            # The rows are stored, so the flush succeeds; the next sync folds
+            # them from the same offset.
+            log.exception("could not update the rollups for %s", self.path)
+
+    def _recover(self, fh):
+        """Replay write-ahead files of stores that are gone into the CSV ``fh``.
+
+        A live store holds the OS lock on its write-ahead file, so a file we
+        can lock belongs to a dead process, whatever pid its name carries.
+        """
+        for n, wal in enumerate(glob.glob(glob.escape(self.path) + ".*.wal")):
+            try:
+                wal_fh = open(wal, encoding="utf-8")
+            except FileNotFoundError:
+                continue  # replayed and removed by another process
+            with wal_fh:
+                if not _try_lock(wal_fh):
+                    continue  # its store is alive
+                # Claim it under a name of our own: a process that opened the
+                # old name before the rename sees it gone, and if we crash
+                # mid-replay the next start-up finds the claimed file instead.
+                claimed = f"{self.wal_path[:-len('.wal')]}-replay{n}.wal"
+                try:
+                    os.rename(wal, claimed)
+                except FileNotFoundError:
+                    continue
+                rows = []
+                for line in wal_fh:
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # torn last line: that append never returned
+                if rows:
+                    self._write_rows(fh, rows)
+                os.remove(claimed)
+
+    def _migrate_header(self, fh):
+        """Rewrite a CSV written by the older apps into ``RESULT_FIELDS``.
+
+        ``fh`` is the CSV, locked exclusively for the whole rewrite.
+        """
+        fh.seek(0)
+        header = next(csv.reader(fh), [])
+        if not header or header == RESULT_FIELDS:
+            return
+        fh.seek(0)
+        old_rows = list(csv.DictReader(fh))
+        rows = []
+        for old in old_rows:
+            row = {LEGACY_COLUMNS.get(k, k): v for k, v in old.items() if k is not None}
+            # final5.py wrote one "<Section> Score" column per section
+            domains = {k[:-len(" Score")]: v for k, v in row.items()
+                       if k.endswith(" Score") and k not in RESULT_FIELDS and v not in ("", None)}
+            if domains and not row.get("Domain Scores"):
+                row["Domain Scores"] = json.dumps(domains, ensure_ascii=False)
+            rows.append({f: row.get(f, "") for f in RESULT_FIELDS})
+        tmp = self.path + ".migrating"
+        with open(tmp, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.path)  # writers waiting on the old file reopen it
+
+
+# ---------- SHARED STORES ----------
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path="results.csv"):
+    """Return the process-wide store for ``path``, creating it on first use.
+
+    With the SQLite backend every path maps to the one results database.
+    """
+    if RESULTS_BACKEND == "sqlite":
+        from results_db import get_db
+        return get_db()
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ResultsStore(path)
+        return store
+
+
+@atexit.register
+def close_all():
+    """Flush and close every shared store (also runs at interpreter exit)."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
@@ -0,0 +1,538 @@
+"""Pre-aggregated rollups of stored screenings, for the cohort dashboard.
+
+Screenings are folded into small SQLite tables as they are stored, all per
+instrument and week:
+
+* ``rollup_screenings``: count and summed risk % per risk band and 10-point
+  risk % bucket;
+* ``rollup_groups``: count per risk band and age band, and per risk band and
+  gender (one table, keyed by dimension and value);
+* ``rollup_domains``: count and summed score per domain.
+
+Each dimension gets its own table rather than one row per combination of all
+of them, so their size depends on the number of weeks and groups -- a few
+thousand rows for years of results -- not on the number of screenings, and the
+dashboard's group-bys stay milliseconds with millions of results stored.
+
+Population norms are kept at a finer grain, per instrument, domain, age band,
+gender and day: ``rollup_domain_norms`` holds the count, sum and sum of squares
+of the domain scores (mean and SD) and ``rollup_domain_histograms`` the count
+per score (percentiles).  Scores are small integers, so the histograms are
+exact, and each submission updates one row per domain in each table.
+
+Each source remembers how far it has been folded (a byte offset into a results
+CSV, the last ``screenings.id`` for the SQLite backend), and the rollups and
+that watermark are updated in one transaction, so every screening is counted
+exactly once.  The CSV store folds new rows whenever it flushes, the SQLite
+backend in the same transaction as the insert, and a rollup database that is
+new or behind (e.g. after a crash) catches up on the next sync:
+
+    rollups = get_rollups()
+    rollups.refresh()                    # fold anything not folded yet
+    rollups.summary("isaa50", start="2026-07-01")
+    rollups.norms("isaa50", age_band="3-5")              # {domain: {n, mean, sd}}
+    rollups.percentiles("isaa50", result.domains, age_band="3-5")
+"""
+
+import csv
+import datetime
+import io
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: readers may see a half-written tail, which waits for the next sync
+    fcntl = None
+
+from results_store import LEGACY_COLUMNS, RESULTS_BACKEND
+
+CSV_SOURCES = ("results.csv", "screening_results.csv")  # where the apps store results
+SCREENINGS_SOURCE = "screenings"  # the SQLite backend's screenings table
+CHUNK_BYTES = 16 * 1024 * 1024
+CHUNK_ROWS = 50_000
+AGE_BANDS = ((0, 2, "0-2"), (3, 5, "3-5"), (6, 11, "6-11"), (12, 17, "12-17"), (18, 200, "18+"))
+# Bump when a table or grain changes: stored rollups are then dropped and refolded.
+ROLLUP_VERSION = 2
+ROLLUP_TABLES = ("rollup_screenings", "rollup_groups", "rollup_domains",
+                 "rollup_domain_norms", "rollup_domain_histograms", "rollup_sources")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_screenings (
+    source         TEXT    NOT NULL,
+    instrument     TEXT    NOT NULL,
+    week           TEXT    NOT NULL,  -- Monday of the ISO week, '' if undated
+    risk_band      TEXT    NOT NULL,
+    percent_bucket INTEGER NOT NULL,  -- 0, 10, ..., 90
+    n              INTEGER NOT NULL,
+    percent_sum    REAL    NOT NULL,
+    PRIMARY KEY (source, instrument, week, risk_band, percent_bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_groups (
+    source     TEXT    NOT NULL,
+    instrument TEXT    NOT NULL,
+    week       TEXT    NOT NULL,
+    risk_band  TEXT    NOT NULL,
+    dimension  TEXT    NOT NULL,  -- 'age' (age band) or 'gender'
+    value      TEXT    NOT NULL,
+    n          INTEGER NOT NULL,
+    PRIMARY KEY (source, instrument, week, risk_band, dimension, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_domains (
+    source     TEXT    NOT NULL,
+    instrument TEXT    NOT NULL,
+    week       TEXT    NOT NULL,
+    domain     TEXT    NOT NULL,
+    n          INTEGER NOT NULL,
+    score_sum  INTEGER NOT NULL,
+    PRIMARY KEY (source, instrument, week, domain)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_domain_norms (
+    instrument   TEXT    NOT NULL,
+    domain       TEXT    NOT NULL,
+    age_band     TEXT    NOT NULL,
+    gender       TEXT    NOT NULL,
+    day          TEXT    NOT NULL,  -- screening date, '' if undated
+    source       TEXT    NOT NULL,
+    n            INTEGER NOT NULL,
+    score_sum    INTEGER NOT NULL,
+    score_sq_sum INTEGER NOT NULL,
+    PRIMARY KEY (instrument, domain, age_band, gender, day, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_domain_histograms (
+    instrument TEXT    NOT NULL,
+    domain     TEXT    NOT NULL,
+    age_band   TEXT    NOT NULL,
+    gender     TEXT    NOT NULL,
+    day        TEXT    NOT NULL,
+    score      INTEGER NOT NULL,
+    source     TEXT    NOT NULL,
+    n          INTEGER NOT NULL,
+    PRIMARY KEY (instrument, domain, age_band, gender, day, score, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup_sources (
+    source   TEXT    PRIMARY KEY,
+    position INTEGER NOT NULL,  -- CSV byte offset, or last screenings.id
+    file_id  TEXT    NOT NULL DEFAULT ''  -- device:inode, to notice a rewritten CSV
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_screenings_instrument_week ON rollup_screenings (instrument, week);
+CREATE INDEX IF NOT EXISTS idx_rollup_groups_instrument_week ON rollup_groups (instrument, week);
+CREATE INDEX IF NOT EXISTS idx_rollup_domains_instrument_week ON rollup_domains (instrument, week);
+"""
+
+
+# ---------- BUCKETS ----------
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def week_of(day):
+    """ISO date of the Monday starting ``day``'s week; '' if ``day`` isn't a date."""
+    day = _date(day)
+    return (day - datetime.timedelta(days=day.weekday())).isoformat() if day else ""
+
+
+def age_band(age):
+    try:
+        age = int(float(age))
+    except (TypeError, ValueError):
+        return "Unknown"
+    return next((label for lo, hi, label in AGE_BANDS if lo <= age <= hi), "Unknown")
+
+
+def _gender(gender):
+    return gender if gender in ("Male", "Female", "Other") else "Unspecified"
+
+
+def _bucket(percent):
+    return min(int(percent // 10) * 10, 90) if percent > 0 else 0
+
+
+# ---------- NORMS ----------
+def _moments(n, total, squares):
+    """Count, mean and sample SD from running sums."""
+    mean = total / n
+    variance = (squares - total * mean) / (n - 1) if n > 1 else 0.0
+    return {"n": n, "mean": round(mean, 2), "sd": round(math.sqrt(max(variance, 0.0)), 2)}
+
+
+def percentile_rank(histogram, score):
+    """Percent of a ``{score: count}`` cohort scoring below ``score``, ties counting half."""
+    n = sum(histogram.values())
+    if not n:
+        return None
+    below = sum(c for s, c in histogram.items() if s < score)
+    return round(100 * (below + 0.5 * histogram.get(score, 0)) / n, 1)
+
+
+def quantile(histogram, q):
+    """Lowest score with at least ``q`` percent of a ``{score: count}`` cohort at or below it."""
+    n = sum(histogram.values())
+    seen = 0
+    for score in sorted(histogram):
+        seen += histogram[score]
+        if seen >= q / 100 * n:
+            return score
+    return None
+
+
+class _Tally:
+    """Rollup increments for a batch of screenings, before they are written."""
+
+    def __init__(self):
+        self.screenings = {}
+        self.groups = {}
+        self.domains = {}
+        self.norms = {}
+        self.histograms = {}
+
+    def add(self, date, instrument, age, gender, percent, band, domains):
+        day = _date(date)
+        week = week_of(day) if day else ""
+        day = day.isoformat() if day else ""
+        instrument = instrument or ""
+        band = band or "Unknown"
+        age, gender = age_band(age), _gender(gender)
+        cell = self.screenings.setdefault((instrument, week, band, _bucket(percent)), [0, 0.0])
+        cell[0] += 1
+        cell[1] += percent
+        for key in ((instrument, week, band, "age", age), (instrument, week, band, "gender", gender)):
+            self.groups[key] = self.groups.get(key, 0) + 1
+        for domain, score in domains.items():
+            cell = self.domains.setdefault((instrument, week, domain), [0, 0])
+            cell[0] += 1
+            cell[1] += score
+            cohort = (instrument, domain, age, gender, day)
+            cell = self.norms.setdefault(cohort, [0, 0, 0])
+            cell[0] += 1
+            cell[1] += score
+            cell[2] += score * score
+            key = (*cohort, score)
+            self.histograms[key] = self.histograms.get(key, 0) + 1
+
+    def add_record(self, record):
+        """Add one ``RESULT_FIELDS`` row as read back from a CSV; False if it can't be."""
+        record = {LEGACY_COLUMNS.get(k, k): v for k, v in record.items() if k is not None}
+        try:
+            percent = float(record.get("Risk %") or "")
+            domains = {d: int(score) for d, score in json.loads(record.get("Domain Scores") or "{}").items()}
+        except (AttributeError, TypeError, ValueError):
+            return False  # a row without a risk % or readable domain scores can't be aggregated
+        self.add(record.get("Date"), record.get("Instrument"), record.get("Age"),
+                 record.get("Gender"), percent, record.get("Risk Band"), domains)
+        return True
+
+
+class Rollups:
+    """Rollup tables on a SQLite connection, and the dashboard's queries over them.
+
+    The SQLite results backend passes its own connection and lock so rollups
+    commit together with the screenings; otherwise use :func:`get_rollups`.
+    """
+
+    def __init__(self, conn, lock=None):
+        self._conn = conn
+        self._lock = lock or threading.Lock()
+        self._refreshed_at = None
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            row = self._conn.execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone()
+            if row is None or int(row[0]) != ROLLUP_VERSION:
+                # Older (or no) rollups: start over; the next sync refolds every source.
+                for table in ROLLUP_TABLES:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.executescript(SCHEMA)
+                self._conn.execute("INSERT OR REPLACE INTO rollup_meta VALUES ('version', ?)",
+                                   (str(ROLLUP_VERSION),))
+
+    @classmethod
+    def open(cls, path="rollups.db"):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn)
+
+    # ---------- FOLDING ----------
+    def _watermark(self, source):
+        row = self._conn.execute("SELECT position, file_id FROM rollup_sources WHERE source = ?",
+                                 (source,)).fetchone()
+        return (row[0], row[1]) if row else (0, "")
+
+    def _write(self, source, tally, position, file_id=""):
+        """Add ``tally`` to the rollups and move the watermark (caller commits)."""
+        self._conn.executemany(
+            "INSERT INTO rollup_screenings VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (source, instrument, week, risk_band, percent_bucket)"
+            " DO UPDATE SET n = n + excluded.n, percent_sum = percent_sum + excluded.percent_sum",
+            [(source, *key, n, total) for key, (n, total) in tally.screenings.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO rollup_groups VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (source, instrument, week, risk_band, dimension, value)"
+            " DO UPDATE SET n = n + excluded.n",
+            [(source, *key, n) for key, n in tally.groups.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO rollup_domains VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (source, instrument, week, domain)"
+            " DO UPDATE SET n = n + excluded.n, score_sum = score_sum + excluded.score_sum",
+            [(source, *key, n, total) for key, (n, total) in tally.domains.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO rollup_domain_norms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (instrument, domain, age_band, gender, day, source) DO UPDATE SET"
+            " n = n + excluded.n, score_sum = score_sum + excluded.score_sum,"
+            " score_sq_sum = score_sq_sum + excluded.score_sq_sum",
+            [(*key, source, *cell) for key, cell in tally.norms.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO rollup_domain_histograms VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (instrument, domain, age_band, gender, day, score, source)"
+            " DO UPDATE SET n = n + excluded.n",
+            [(*key, source, n) for key, n in tally.histograms.items()],
+        )
+        self._conn.execute(
+            "INSERT INTO rollup_sources VALUES (?, ?, ?)"
+            " ON CONFLICT (source) DO UPDATE SET position = excluded.position, file_id = excluded.file_id",
+            (source, position, file_id),
+        )
+
+    def _forget(self, source):
+        for table in ROLLUP_TABLES:
+            self._conn.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+
+    def sync_csv(self, path):
+        """Fold rows appended to the results CSV at ``path`` since the last sync.
+
+        Returns the number of rows folded.  A CSV that was rewritten (a header
+        migration) or truncated is folded again from the start.
+        """
+        source = os.path.abspath(path)
+        try:
+            fh = open(source, "rb")
+        except FileNotFoundError:
+            return 0
+        folded = 0
+        with fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_SH)  # writers hold LOCK_EX while appending rows
+            stat = os.fstat(fh.fileno())
+            file_id = f"{stat.st_dev}:{stat.st_ino}"
+            header = fh.readline()
+            if not header.endswith(b"\n"):
+                return 0
+            fieldnames = next(csv.reader([header.decode("utf-8")]))
+            # One chunk of whole lines per transaction, committed with its offset.
+            while True:
+                with self._lock, self._conn:
+                    # IMMEDIATE: another process syncing this CSV waits here rather
+                    # than reading the same watermark and counting rows twice.
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    position, known_id = self._watermark(source)
+                    if known_id != file_id or position > stat.st_size:
+                        self._forget(source)
+                        position = 0
+                    position = max(position, len(header))
+                    fh.seek(position)
+                    chunk = fh.read(CHUNK_BYTES)
+                    end = chunk.rfind(b"\n") + 1
+                    if end == 0:
+                        return folded
+                    tally = _Tally()
+                    text = io.StringIO(chunk[:end].decode("utf-8"), newline="")
+                    folded += sum(tally.add_record(row) for row in csv.DictReader(text, fieldnames=fieldnames))
+                    self._write(source, tally, position + end, file_id)
+
+    def fold_screenings(self):
+        """Fold screenings inserted since the last sync, inside the caller's insert.
+
+        The caller holds the lock and a write transaction, which it commits
+        (``ResultsDB.append_many``); otherwise use :meth:`sync_screenings`.
+        """
+        position, _ = self._watermark(SCREENINGS_SOURCE)
+        folded = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT id, screened_on, instrument, age, gender, percent, risk_band"
+                " FROM screenings WHERE id > ? ORDER BY id LIMIT ?",
+                (position, CHUNK_ROWS),
+            ).fetchall()
+            if not rows:
+                return folded
+            last = rows[-1][0]
+            domains = {}
+            for sid, domain, score in self._conn.execute(
+                    "SELECT screening_id, domain, score FROM screening_domains"
+                    " WHERE screening_id > ? AND screening_id <= ?", (position, last)):
+                domains.setdefault(sid, {})[domain] = score
+            tally = _Tally()
+            for sid, *row in rows:
+                tally.add(*row, domains.get(sid, {}))
+            self._write(SCREENINGS_SOURCE, tally, last)
+            position = last
+            folded += len(rows)
+
+    def sync_screenings(self):
+        """Fold rows of this database's ``screenings`` table (SQLite backend)."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")  # see sync_csv
+            return self.fold_screenings()
+
+    def refresh(self, directory=".", max_age=0):
+        """Fold everything the apps stored since the last sync.
+
+        With ``max_age`` (seconds), skip it if the last refresh is that recent.
+        """
+        now = time.monotonic()
+        if max_age and self._refreshed_at is not None and now - self._refreshed_at < max_age:
+            return 0
+        self._refreshed_at = now
+        if RESULTS_BACKEND == "sqlite":
+            return self.sync_screenings()
+        return sum(self.sync_csv(os.path.join(directory, p)) for p in CSV_SOURCES)
+
+    # ---------- QUERIES ----------
+    def _query(self, sql, table, instrument, start, end, group="", dimension=None):
+        where, params = [], []
+        if dimension is not None:
+            where.append("dimension = ?")
+            params.append(dimension)
+        if instrument is not None:
+            where.append("instrument = ?")
+            params.append(instrument)
+        if start is not None:
+            where.append("week >= ?")
+            params.append(week_of(start))
+        if end is not None:
+            where.append("week BETWEEN '0' AND ?")  # '0' leaves out undated rows
+            params.append(str(end))
+        sql = f"{sql} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group:
+            sql += f" GROUP BY {group} ORDER BY {group}"
+        return self._conn.execute(sql, params).fetchall()
+
+    def instruments(self):
+        """``{instrument: screenings}``, most screened first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT instrument, SUM(n) FROM rollup_screenings"
+                                      " GROUP BY instrument ORDER BY SUM(n) DESC").fetchall()
+        return dict(rows)
+
+    def summary(self, instrument=None, start=None, end=None):
+        """Everything the dashboard shows, for one instrument (or all) and date range.
+
+        ``start``/``end`` are ISO dates and select whole weeks.
+        """
+        q = self._query
+        args = (instrument, start, end)
+        with self._lock:
+            (n, percent_sum), = q("SELECT COALESCE(SUM(n), 0), COALESCE(SUM(percent_sum), 0)",
+                                  "rollup_screenings", *args)
+            return {
+                "screenings": n,
+                "mean_percent": round(percent_sum / n, 2) if n else None,
+                "by_band": dict(q("SELECT risk_band, SUM(n)", "rollup_screenings", *args, "risk_band")),
+                "percent_histogram": dict(q("SELECT percent_bucket, SUM(n)", "rollup_screenings", *args,
+                                            "percent_bucket")),
+                "by_week": q("SELECT week, risk_band, SUM(n)", "rollup_screenings", *args, "week, risk_band"),
+                "by_age": q("SELECT value, risk_band, SUM(n)", "rollup_groups", *args,
+                            "value, risk_band", dimension="age"),
+                "by_gender": q("SELECT value, risk_band, SUM(n)", "rollup_groups", *args,
+                               "value, risk_band", dimension="gender"),
+                "domain_means": {d: round(s / c, 2) for d, c, s in q(
+                    "SELECT domain, SUM(n), SUM(score_sum)", "rollup_domains", *args, "domain")},
+            }
+
+    def _cohort(self, sql, table, instrument, domains, age_band, gender, start, end, group):
+        where, params = ["instrument = ?"], [instrument]
+        if domains is not None:
+            where.append(f"domain IN ({', '.join('?' * len(domains))})")
+            params += list(domains)
+        for column, value in (("age_band", age_band), ("gender", gender)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            where.append("day >= ?")
+            params.append(str(start))
+        if end is not None:
+            where.append("day BETWEEN '0' AND ?")  # '0' leaves out undated rows
+            params.append(str(end))
+        sql = f"{sql} FROM {table} WHERE {' AND '.join(where)} GROUP BY {group}"
+        return self._conn.execute(sql, params).fetchall()
+
+    def norms(self, instrument, age_band=None, gender=None, start=None, end=None):
+        """Domain score norms, ``{domain: {"n", "mean", "sd"}}``.
+
+        The cohort is ``instrument``'s screenings, optionally narrowed to an age
+        band (see :func:`age_band`), a gender and ISO dates ``start`` .. ``end``.
+        """
+        with self._lock:
+            rows = self._cohort("SELECT domain, SUM(n), SUM(score_sum), SUM(score_sq_sum)",
+                                "rollup_domain_norms", instrument, None, age_band, gender, start, end,
+                                "domain")
+        return {d: _moments(n, total, squares) for d, n, total, squares in rows}
+
+    def histograms(self, instrument, domains=None, age_band=None, gender=None, start=None, end=None):
+        """``{domain: {score: screenings}}`` for a cohort (see :meth:`norms`)."""
+        with self._lock:
+            rows = self._cohort("SELECT domain, score, SUM(n)", "rollup_domain_histograms",
+                                instrument, domains, age_band, gender, start, end, "domain, score")
+        histograms = {}
+        for domain, score, n in rows:
+            histograms.setdefault(domain, {})[score] = n
+        return histograms
+
+    def percentiles(self, instrument, scores, age_band=None, gender=None, start=None, end=None):
+        """Where ``{domain: score}`` falls in a cohort: ``{domain: {"percentile", "n"}}``."""
+        histograms = self.histograms(instrument, list(scores), age_band, gender, start, end)
+        return {d: {"percentile": percentile_rank(h, int(scores[d])), "n": sum(h.values())}
+                for d, h in histograms.items()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------- SHARED ROLLUPS ----------
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def rollups_path(directory="."):
+    """The rollup database for results stored in ``directory`` (CSV backend).
+
+    ``ASD_ROLLUPS_DB`` overrides it, for the results store and the dashboard alike.
+    """
+    return os.environ.get("ASD_ROLLUPS_DB") or os.path.join(directory, "rollups.db")
+
+
+def get_rollups(path=None):
+    """Return the process-wide :class:`Rollups`.
+
+    With the SQLite backend they live in the results database itself;
+    otherwise in ``path`` (default :func:`rollups_path`).
+    """
+    if RESULTS_BACKEND == "sqlite":
+        from results_db import get_db
+        return get_db().rollups
+    path = path or rollups_path()
+    key = os.path.abspath(path)
+    with _rollups_lock:
+        rollups = _rollups.get(key)
+        if rollups is None:
+            rollups = _rollups[key] = Rollups.open(path)
+        return rollups
@@ -0,0 +1,178 @@
+"""Shared scoring engine for the screening questionnaires.
+
+A questionnaire definition (items grouped into domains, option -> points map
+and risk bands) is compiled once into integer-coded NumPy arrays.  Answers are
+then scored by table lookup, either one response at a time or a whole batch of
+responses in a single vectorised pass.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Code 0 is reserved for "no answer" and always scores 0 points, the same as
+# ``score_map.get(a, 0)`` did in the apps.
+UNANSWERED = 0
+
+# ---------- RISK BANDS ----------
+# (lower bound, label) pairs, ascending.  Used by the ISAA-style apps on percent.
+PERCENT_BANDS = ((0, "Low"), (40, "Moderate"), (60, "High"))
+
+
+@dataclass(frozen=True)
+class Score:
+    total: int
+    max_score: int
+    percent: float
+    domains: dict
+    band: str
+
+
+@dataclass(frozen=True)
+class BatchScore:
+    total: np.ndarray      # (n,)
+    percent: np.ndarray    # (n,)
+    domains: np.ndarray    # (n, n_domains)
+    band: np.ndarray       # (n,) index into ``band_labels``
+    domain_names: tuple
+    band_labels: tuple
+
+    def __len__(self):
+        return len(self.total)
+
+    def bands(self):
+        labels = np.asarray(self.band_labels, dtype=object)
+        return labels[self.band]
+
+
+class Questionnaire:
+    """A compiled questionnaire.  Build it with :func:`compile_questionnaire`."""
+
+    def __init__(self, items, section_sizes, domain_names, options, points,
+                 band_bounds, band_labels, band_on):
+        self.items = tuple(items)
+        self.domain_names = tuple(domain_names)
+        self.options = tuple(options)
+        self.codes = {opt: code for code, opt in enumerate(self.options, start=1)}
+        self.points = points
+        self.band_bounds = band_bounds
+        self.band_labels = tuple(band_labels)
+        self.band_on = band_on
+        self.max_score = int(points.max()) * len(self.items)
+
+        # ---------- SECTION INDEX ----------
+        # Items are stored section by section, so section d is the contiguous
+        # slice offsets[d]:offsets[d+1] and every paging / domain lookup is O(1).
+        self.offsets = np.concatenate(([0], np.cumsum(section_sizes))).astype(np.intp)
+        self.item_domain = np.repeat(np.arange(len(section_sizes)), section_sizes)
+        self._slices = tuple(slice(int(a), int(b))
+                             for a, b in zip(self.offsets[:-1], self.offsets[1:]))
+        # reduceat needs strictly increasing starts, so empty sections are skipped.
+        self._nonempty = np.flatnonzero(np.asarray(section_sizes) > 0)
+
+        for arr in (self.points, self.item_domain, self.offsets, self.band_bounds):
+            arr.flags.writeable = False
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def n_sections(self):
+        return len(self.domain_names)
+
+    def section_slice(self, section):
+        """Slice of item positions belonging to section number ``section``."""
+        return self._slices[section]
+
+    def section_start(self, section):
+        """Position of the first item of section number ``section``."""
+        return int(self.offsets[section])
+
+    def section_of(self, item):
+        """Section number that item position ``item`` belongs to."""
+        return int(self.item_domain[item])
+
+    def __repr__(self):
+        return (f"Questionnaire({len(self.items)} items, "
+                f"{len(self.domain_names)} domains, options={list(self.options)})")
+
+    # ---------- ENCODING ----------
+    def encode(self, answers):
+        """Turn one sequence of option labels into an int8 code vector."""
+        if len(answers) != len(self.items):
+            raise ValueError(f"expected {len(self.items)} answers, got {len(answers)}")
+        get = self.codes.get
+        return np.fromiter((get(a, UNANSWERED) for a in answers),
+                           dtype=np.int8, count=len(self.items))
+
+    def encode_batch(self, rows):
+        """Encode an iterable of answer sequences into an (n, n_items) code matrix."""
+        encoded = [self.encode(r) for r in rows]
+        if not encoded:
+            return np.zeros((0, len(self.items)), dtype=np.int8)
+        return np.stack(encoded)
+
+    # ---------- SCORING ----------
+    def score_batch(self, codes):
+        """Score an (n, n_items) code matrix in one vectorised pass."""
+        codes = np.asarray(codes)
+        if codes.ndim != 2 or codes.shape[1] != len(self.items):
+            raise ValueError(f"expected an (n, {len(self.items)}) code matrix, got {codes.shape}")
+        item_points = self.points[codes]
+        domains = np.zeros((codes.shape[0], self.n_sections), dtype=np.int64)
+        if codes.shape[0] and len(self._nonempty):
+            starts = self.offsets[self._nonempty]
+            domains[:, self._nonempty] = np.add.reduceat(item_points, starts, axis=1, dtype=np.int64)
+        total = item_points.sum(axis=1, dtype=np.int64)
+        percent = np.round(total / self.max_score * 100, 2)
+        value = percent if self.band_on == "percent" else total
+        band = np.searchsorted(self.band_bounds, value, side="right") - 1
+        return BatchScore(total, percent, domains, band.clip(0),
+                          self.domain_names, self.band_labels)
+
+    def score(self, answers):
+        """Score a single response given as option labels."""
+        batch = self.score_batch(self.encode(answers)[None, :])
+        total = int(batch.total[0])
+        return Score(
+            total=total,
+            max_score=self.max_score,
+            percent=round(total / self.max_score * 100, 2),
+            domains=dict(zip(self.domain_names, batch.domains[0].tolist())),
+            band=self.band_labels[batch.band[0]],
+        )
+
+
+def compile_questionnaire(sections, score_map, options=None, bands=PERCENT_BANDS,
+                          band_on="percent"):
+    """Compile a ``{domain: [items]}`` definition into a :class:`Questionnaire`.
+
+    ``score_map`` maps option labels to points.  ``options`` fixes the option
+    order (defaults to the order of ``score_map``); labels without points, like
+    a "Select" placeholder, score 0.  ``bands`` are ``(lower bound, label)``
+    pairs applied to ``band_on``, either ``"percent"`` or ``"total"``.
+    """
+    if band_on not in ("percent", "total"):
+        raise ValueError(f"band_on must be 'percent' or 'total', not {band_on!r}")
+    options = list(options if options is not None else score_map)
+    points = np.zeros(len(options) + 1, dtype=np.int16)
+    for code, opt in enumerate(options, start=1):
+        points[code] = score_map.get(opt, 0)
+
+    items, section_sizes = [], []
+    for qs in sections.values():
+        items.extend(qs)
+        section_sizes.append(len(qs))
+
+    bands = sorted(bands)
+    return Questionnaire(
+        items=items,
+        section_sizes=section_sizes,
+        domain_names=list(sections),
+        options=options,
+        points=points,
+        band_bounds=np.asarray([b for b, _ in bands], dtype=np.float64),
+        band_labels=[label for _, label in bands],
+        band_on=band_on,
+    )
+
@@ -0,0 +1,372 @@
+"""HTTP scoring API, for clinics that submit completed forms from their own systems.
+
+    python scoring_api.py --port 8600 --workers 4
+
+Scores use the same definitions and the same scoring.py engine as the Streamlit
+apps. Results go to the same store (``results.csv``, or the SQLite database with
+``ASD_RESULTS_BACKEND=sqlite``). JSON in, JSON out:
+
+    GET  /health
+    GET  /instruments                 ids, versions and titles
+    GET  /instruments/<id>            options, bands and items of one instrument
+    POST /score/<id>                  {"answers": [...], "name": ..., "age": ..., "gender": ...}
+    POST /score/<id>/batch            {"responses": [{"answers": [...], ...}, ...]}
+
+``answers`` is either a list of option labels in item order or an object keyed
+``q1`` .. ``qN``.  Labels match case-insensitively; ``null`` or ``""`` means
+unanswered and scores 0.  ``age`` (whole years, 0-120), ``gender`` (Male,
+Female or Other) and ``name`` are optional.  Send ``"save": false`` to score
+without storing.
+
+The server is a plain asyncio HTTP/1.1 loop with keep-alive, from the
+standard library only.  A batch is scored in one vectorised pass.  Saves are
+group-committed: whatever arrives while one fsync is in progress is written
+together with the next one, so durability costs one disk flush per batch of
+requests rather than per request.  ``--workers N`` forks N processes that share
+the port (SO_REUSEPORT).
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import signal
+import socket
+import sys
+from dataclasses import asdict
+from http import HTTPStatus
+
+from instruments import available_instruments, load_instrument
+from results_store import close_all, get_store, make_record
+from scoring import Score
+
+MAX_BODY = 8 * 1024 * 1024
+MAX_BATCH = 10_000
+SHUTDOWN_SECONDS = 10  # how long --workers waits for each worker to flush and exit
+WRITE_BATCH = 1000  # most records the writer hands to one append_many
+MAX_AGE = 120
+GENDERS = ("Male", "Female", "Other")  # as the apps' Gender selectbox
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------- SCORING ----------
+@functools.lru_cache(maxsize=None)
+def registry():
+    """Every instrument under definitions/, compiled once per process."""
+    return {i: load_instrument(i) for i in available_instruments()}
+
+
+def _instrument(instrument_id):
+    try:
+        return registry()[instrument_id]
+    except KeyError:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"unknown instrument {instrument_id!r}") from None
+
+
+def _option_lookup(instrument):
+    return {opt.casefold(): opt for opt in instrument.options}
+
+
+def parse_answers(instrument, answers, lookup=None):
+    """Validate one response's answers into option labels in item order."""
+    n = len(instrument.items)
+    if isinstance(answers, dict):
+        answers = [answers.get(f"q{i}") for i in range(1, n + 1)]
+    if not isinstance(answers, list) or len(answers) != n:
+        raise ApiError(HTTPStatus.BAD_REQUEST,
+                       f"{instrument.id} expects 'answers' as a list of {n} labels or an object q1..q{n}")
+    lookup = lookup or _option_lookup(instrument)
+    labels = []
+    for i, a in enumerate(answers, start=1):
+        if a is None or a == "":
+            labels.append("")
+            continue
+        label = lookup.get(str(a).strip().casefold())
+        if label is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"q{i}: {a!r} is not one of {list(instrument.options)}")
+        labels.append(label)
+    return labels
+
+
+def parse_participant(response):
+    """Validate a response's optional ``name``, ``age`` and ``gender``."""
+    name = response.get("name") or ""
+    if not isinstance(name, str) or len(name) > 200:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'name' must be a string of at most 200 characters")
+    age = response.get("age")
+    if age is None or age == "":
+        age = ""
+    else:
+        if isinstance(age, str) and age.strip().isdigit():
+            age = int(age)
+        if isinstance(age, bool) or not isinstance(age, int):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'age' must be a whole number of years, got {age!r}")
+        if not 0 <= age <= MAX_AGE:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'age' must be between 0 and {MAX_AGE}, got {age}")
+    gender = response.get("gender") or ""
+    if gender:
+        match = {g.casefold(): g for g in GENDERS}.get(str(gender).strip().casefold())
+        if match is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'gender' must be one of {list(GENDERS)}, got {gender!r}")
+        gender = match
+    return name, age, gender
+
+
+def _score_at(questionnaire, batch, i):
+    return Score(
+        total=int(batch.total[i]),
+        max_score=questionnaire.max_score,
+        percent=float(batch.percent[i]),
+        domains=dict(zip(batch.domain_names, batch.domains[i].tolist())),
+        band=batch.band_labels[batch.band[i]],
+    )
+
+
+def score_responses(instrument, responses, batch=True):
+    """Score a list of response objects in one vectorised pass.
+
+    Returns the JSON results and the ``(record, answers)`` pairs to save.
+    """
+    questionnaire = instrument.questionnaire
+    lookup = _option_lookup(instrument)
+    answers, participants = [], []
+    for n, response in enumerate(responses):
+        if not isinstance(response, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"response {n}: expected an object")
+        try:
+            answers.append(parse_answers(instrument, response.get("answers"), lookup))
+            participants.append(parse_participant(response))
+        except ApiError as e:
+            raise ApiError(e.status, f"response {n}: {e}" if batch else str(e)) from None
+    scores = questionnaire.score_batch(questionnaire.encode_batch(answers))
+
+    results, to_save = [], []
+    for i, response in enumerate(responses):
+        score = _score_at(questionnaire, scores, i)
+        results.append({"instrument": instrument.id, "version": instrument.version, **asdict(score)})
+        if response.get("save", True):
+            record = make_record(*participants[i], score, instrument=instrument.id)
+            to_save.append((record, answers[i]))
+    return results, to_save
+
+
+# ---------- GROUP-COMMIT WRITER ----------
+class ResultWriter:
+    """Queue records and hand them to the results store in batches.
+
+    One background task drains the queue: each ``append_many`` (one fsync, or
+    one SQLite transaction) takes everything queued since the previous one,
+    and the requests waiting on it are answered once it returns.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    async def save(self, pairs):
+        """Return once every ``(record, answers)`` pair is durably stored."""
+        if not pairs:
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((pairs, done))
+        await done
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            size = len(jobs[0][0])
+            while size < WRITE_BATCH and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+                size += len(jobs[-1][0])
+            pairs = [p for job, _ in jobs for p in job]
+            try:
+                await loop.run_in_executor(None, self.store.append_many,
+                                           [r for r, _ in pairs], [a for _, a in pairs])
+            except Exception as e:  # report to every waiting request, keep serving
+                for _, done in jobs:
+                    done.set_exception(e)
+            else:
+                for _, done in jobs:
+                    done.set_result(None)
+
+
+# ---------- ROUTES ----------
+def _describe(instrument, full=False):
+    out = {"id": instrument.id, "version": instrument.version, "title": instrument.title,
+           "items": len(instrument.items)}
+    if full:
+        out.update(
+            options=list(instrument.options),
+            scores=instrument.score_map,
+            band_on=instrument.band_on,
+            bands=[list(b) for b in instrument.bands],
+            sections=[{"name": s.name, "items": list(s.items)} for s in instrument.sections],
+        )
+    return out
+
+
+async def route(method, path, body, writer):
+    """Dispatch one request; returns ``(status, payload)``."""
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if parts == ["health"] and method == "GET":
+        return HTTPStatus.OK, {"status": "ok"}
+    if parts[:1] == ["instruments"] and len(parts) <= 2 and method == "GET":
+        if len(parts) == 1:
+            return HTTPStatus.OK, [_describe(i) for i in registry().values()]
+        return HTTPStatus.OK, _describe(_instrument(parts[1]), full=True)
+    if parts[:1] == ["score"] and (len(parts) == 2 or (len(parts) == 3 and parts[2] == "batch")):
+        if method != "POST":
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST")
+        instrument = _instrument(parts[1])
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+        if len(parts) == 2:
+            results, to_save = score_responses(instrument, [payload], batch=False)
+            await writer.save(to_save)
+            return HTTPStatus.OK, results[0]
+        responses = payload.get("responses")
+        if not isinstance(responses, list) or not 0 < len(responses) <= MAX_BATCH:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'responses' must be a list of 1..{MAX_BATCH} objects")
+        results, to_save = score_responses(instrument, responses)
+        await writer.save(to_save)
+        return HTTPStatus.OK, {"results": results}
+    raise ApiError(HTTPStatus.NOT_FOUND, f"no route for {method} {path}")
+
+
+# ---------- HTTP ----------
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def handle_connection(reader, stream, writer):
+    """Serve HTTP/1.1 requests on one connection until the client closes it."""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, path, version = lines[0].split(" ", 2)
+            except ValueError:
+                stream.write(_response(HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}, False))
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+            try:
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY} bytes")
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await route(method, path, body, writer)
+            except ApiError as e:
+                status, payload = e.status, {"error": str(e)}
+                if e.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
+                    keep_alive = False  # the unread body is still on the wire
+            except ValueError:
+                status, payload, keep_alive = HTTPStatus.BAD_REQUEST, {"error": "bad Content-Length"}, False
+            except asyncio.IncompleteReadError:
+                return
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": type(e).__name__}
+
+            stream.write(_response(status, payload, keep_alive))
+            await stream.drain()
+            if not keep_alive:
+                return
+    finally:
+        stream.close()
+
+
+async def serve(host, port, reuse_port=False, results_path="results.csv"):
+    registry()  # compile every definition before the first request
+    writer = ResultWriter(get_store(results_path))
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(r, w, writer), host, port,
+        reuse_port=reuse_port, backlog=1024)
+    # SIGTERM (from the --workers parent, systemd, docker stop) stops accepting and
+    # returns, so run() flushes the store instead of the process dying with rows
+    # still in its write-ahead file.
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await stop.wait()
+    server.close()
+
+
+def run(host, port, reuse_port=False, results_path="results.csv"):
+    try:
+        asyncio.run(serve(host, port, reuse_port, results_path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Saves still in the executor finish when asyncio.run shuts it down;
+        # forked workers exit without running atexit hooks, so flush here.
+        close_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the screening instruments over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument("--results", default="results.csv", help="results CSV (CSV backend)")
+    args = parser.parse_args(argv)
+
+    print(f"Scoring API on http://{args.host}:{args.port} "
+          f"({args.workers} worker{'s' if args.workers > 1 else ''}, instruments: {', '.join(registry())})")
+    if args.workers == 1:
+        run(args.host, args.port, results_path=args.results)
+        return
+    if not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--workers needs SO_REUSEPORT (Linux / BSD / macOS)")
+    workers = [multiprocessing.Process(target=run, args=(args.host, args.port, True, args.results))
+               for _ in range(args.workers)]
+    for w in workers:
+        w.start()
+    # SIGTERM to the parent (systemd, docker stop) stops the workers too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for w in workers:
+            w.join()
+    except KeyboardInterrupt:
+        pass  # the workers got the same Ctrl-C
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()  # SIGTERM: the worker flushes its store and exits
+        for w in workers:
+            w.join(SHUTDOWN_SECONDS)
+            if w.is_alive():
+                w.kill()
+                w.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""All screening instruments in one Streamlit app.
+
+    streamlit run screening_app.py
+
+Every instrument registered in ``INSTRUMENTS`` gets its own page (and URL,
+e.g. /aq20) in the sidebar.  They share one server process -- one import cost,
+one set of compiled definitions from instruments.py -- and one results store,
+so a single pool of workers serves every tool.  To add an instrument, write its
+definitions/<id>.json and add a line below.  The cohort dashboard
+(dashboard.py) is the Analytics page.
+"""
+
+import functools
+
+import streamlit as st
+from dashboard import dashboard_page
+from instruments import load_instrument
+from results_store import get_store, make_record
+from rollups import age_band, get_rollups
+
+# ---------- REGISTERED INSTRUMENTS ----------
+# (definition id, page title, icon); the first one is the landing page.
+INSTRUMENTS = [
+    ("isaa50", "ISAA-50", "🧩"),
+    ("isaa40", "ISAA-40", "📋"),
+    ("qchat10", "QCHAT-10", "👶"),
+    ("aq20", "AQ-20", "🧑"),
+]
+RESULTS_PATH = "results.csv"
+MIN_COHORT = 30  # earlier screenings needed before percentiles are shown
+
+
+# ---------- SCREENING PAGE ----------
+def screening_page(instrument_id):
+    """Questionnaire, result and saved record for one instrument."""
+    instrument = load_instrument(instrument_id)
+    questionnaire = instrument.questionnaire
+    options = list(instrument.options)
+
+    st.title(instrument.title)
+    if instrument.description:
+        st.markdown(instrument.description)
+    st.caption("This is a screening tool only — not a diagnosis.")
+
+    # One form per page: answering doesn't rerun the script, only submitting.
+    answers = []
+    with st.form(f"{instrument_id}-form"):
+        st.markdown("### Personal details:")
+        name = st.text_input("Name")
+        age = st.number_input("Age", min_value=1, max_value=100)
+        gender = st.selectbox("Gender", ["Select", "Male", "Female", "Other"])
+
+        for section in instrument.sections:
+            if len(instrument.sections) > 1:
+                st.subheader(section.title)
+            for q in section.items:
+                i = len(answers) + 1
+                answers.append(st.radio(f"{i}. {q}", options, index=None, horizontal=True,
+                                        key=f"{instrument_id}-q{i}"))
+
+        submitted = st.form_submit_button("✔ Submit & View Result", type="primary")
+
+    if not submitted:
+        return
+    unanswered = answers.count(None)
+    if unanswered:
+        st.error(f"Please answer all questions before submitting ({unanswered} of {len(answers)} left).")
+        return
+
+    result = questionnaire.score(answers)
+    st.subheader("Screening Summary")
+    st.write(f"**Total Score:** {result.total} / {result.max_score}")
+    st.write(f"**Risk Percentage:** {result.percent}%")
+
+    # Lowest band reads as good news, highest as a referral, anything between as a caution.
+    level = questionnaire.band_labels.index(result.band)
+    if level == 0:
+        st.success(f"Result: **{result.band}**")
+    elif level == len(questionnaire.band_labels) - 1:
+        st.error(f"Result: **{result.band}** — professional evaluation recommended.")
+    else:
+        st.warning(f"Result: **{result.band}** — consider consulting a specialist.")
+
+    if len(result.domains) > 1:
+        st.markdown("### Domain-wise Scores")
+        st.bar_chart(result.domains)
+
+    # Looked up before saving, so the cohort is earlier screenings only.
+    cohort = age_band(age)
+    ranks = {d: r for d, r in get_rollups().percentiles(instrument_id, result.domains, age_band=cohort).items()
+             if r["n"] >= MIN_COHORT}
+    if ranks:
+        st.markdown(f"### Compared with earlier screenings (age {cohort})")
+        st.markdown("| Domain | Score | Percentile | Cohort |\n|---|---:|---:|---:|\n" + "\n".join(
+            f"| {d} | {result.domains[d]} | {r['percentile']:.0f} | {r['n']:,} |" for d, r in ranks.items()))
+        st.caption("Percentile: share of earlier screenings of the same age band scoring lower (ties count half).")
+
+    get_store(RESULTS_PATH).append(
+        make_record(name, age, gender, result, instrument=instrument_id),
+        answers=answers,
+    )
+    st.success("Result saved")
+
+
+# ---------- ROUTER ----------
+st.set_page_config(page_title="ASD Screening Tools", layout="centered")
+
+pages = [
+    st.Page(functools.partial(screening_page, instrument_id), title=title, icon=icon,
+            url_path=instrument_id, default=(n == 0))
+    for n, (instrument_id, title, icon) in enumerate(INSTRUMENTS)
+]
+analytics = [st.Page(dashboard_page, title="Cohort dashboard", icon="📊", url_path="dashboard")]
+st.navigation({"Screening": pages, "Analytics": analytics}).run()
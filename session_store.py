@@ -0,0 +1,244 @@
+"""Server-side progress for partially completed questionnaires.
+
+The paged apps keep the current page and answers here as well as in
+``st.session_state``, keyed by a resume token that also sits in the page URL
+(``?resume=<token>``).  A caregiver who reconnects -- after a dropped
+connection, a worker restart, or to a different replica behind the balancer --
+gets their page and answers back.
+
+Every store implements the same small interface (:class:`SessionStore`):
+
+    store = get_session_store()
+    token = new_token()
+    store.set_answer(token, 12, "Often")
+    store.set_page(token, 2)
+    store.load(token)      # {"page": 2, "answers": {12: "Often"}, "updated_at": ...}
+    store.discard(token)   # after the screening is submitted
+
+Sessions untouched for ``ASD_SESSION_MAX_AGE_DAYS`` (default 30) are dropped
+when the process first opens its store.
+
+Writes are per answer / per page change, never the whole state.  Two backends
+ship here, chosen with ``ASD_SESSION_BACKEND``:
+
+* ``sqlite`` (default) -- ``ASD_SESSION_DB``, default sessions.db; replicas on
+  one host (or a shared volume) share it;
+* ``file`` -- one append-only JSON-lines log per token under
+  ``ASD_SESSION_DIR`` (default sessions/).
+
+A networked store (e.g. Redis: one hash per token, ``HSET token page 2`` /
+``HSET token a:12 Often``, ``EXPIRE`` for cleanup) only has to provide the same
+five methods.
+"""
+
+import abc
+import datetime
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+
+SESSION_BACKEND = os.environ.get("ASD_SESSION_BACKEND", "sqlite")
+SESSION_MAX_AGE_DAYS = int(os.environ.get("ASD_SESSION_MAX_AGE_DAYS", "30"))
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def new_token():
+    """A fresh, unguessable resume token (URL- and filename-safe)."""
+    return secrets.token_urlsafe(16)
+
+
+def valid_token(token):
+    return isinstance(token, str) and bool(TOKEN_PATTERN.match(token))
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class SessionStore(abc.ABC):
+    """Interface shared by the session backends."""
+
+    @abc.abstractmethod
+    def load(self, token):
+        """``{"page", "answers", "updated_at"}`` for ``token``, or None if unknown."""
+
+    @abc.abstractmethod
+    def set_page(self, token, page):
+        """Record that ``token`` is on section ``page``."""
+
+    @abc.abstractmethod
+    def set_answer(self, token, index, answer):
+        """Record the answer to item ``index`` (0-based)."""
+
+    @abc.abstractmethod
+    def discard(self, token):
+        """Forget ``token`` (its screening was submitted or abandoned)."""
+
+    @abc.abstractmethod
+    def expire(self, max_age_days=SESSION_MAX_AGE_DAYS):
+        """Drop sessions not touched for ``max_age_days``; return how many."""
+
+
+# ---------- SQLITE BACKEND ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token      TEXT PRIMARY KEY,
+    page       INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT    NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_answers (
+    token  TEXT    NOT NULL REFERENCES sessions(token) ON DELETE CASCADE,
+    item   INTEGER NOT NULL,
+    answer TEXT,
+    PRIMARY KEY (token, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite database (WAL mode, one row per answer)."""
+
+    def __init__(self, path="sessions.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def _touch(self, token, page=None):
+        self._conn.execute(
+            "INSERT INTO sessions (token, page, updated_at) VALUES (?, COALESCE(?, 0), ?) "
+            "ON CONFLICT(token) DO UPDATE SET page = COALESCE(?, page), updated_at = excluded.updated_at",
+            (token, page, _now(), page),
+        )
+
+    def load(self, token):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page, updated_at FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None:
+                return None
+            answers = self._conn.execute(
+                "SELECT item, answer FROM session_answers WHERE token = ?", (token,)).fetchall()
+        return {"page": row[0], "answers": dict(answers), "updated_at": row[1]}
+
+    def set_page(self, token, page):
+        with self._lock, self._conn:
+            self._touch(token, page)
+
+    def set_answer(self, token, index, answer):
+        with self._lock, self._conn:
+            self._touch(token)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_answers (token, item, answer) VALUES (?, ?, ?)",
+                (token, index, answer))
+
+    def discard(self, token):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def expire(self, max_age_days=SESSION_MAX_AGE_DAYS):
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat()
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------- FILE BACKEND ----------
+class FileSessionStore(SessionStore):
+    """One append-only JSON-lines log per token; ``load`` replays it.
+
+    Each change is a single short ``O_APPEND`` write, so concurrent writers
+    (threads or replicas sharing the directory) never interleave lines.
+    """
+
+    def __init__(self, directory="sessions"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, token):
+        if not valid_token(token):
+            raise ValueError(f"invalid session token {token!r}")
+        return os.path.join(self.directory, f"{token}.jsonl")
+
+    def _append(self, token, event):
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self._path(token), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def load(self, token):
+        state = {"page": 0, "answers": {}, "updated_at": None}
+        try:
+            with open(self._path(token), encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if "page" in event:
+                        state["page"] = event["page"]
+                    if "item" in event:
+                        state["answers"][event["item"]] = event["answer"]
+                    state["updated_at"] = event.get("at", state["updated_at"])
+        except FileNotFoundError:
+            return None
+        return state
+
+    def set_page(self, token, page):
+        self._append(token, {"page": page, "at": _now()})
+
+    def set_answer(self, token, index, answer):
+        self._append(token, {"item": index, "answer": answer, "at": _now()})
+
+    def discard(self, token):
+        try:
+            os.remove(self._path(token))
+        except FileNotFoundError:
+            pass
+
+    def expire(self, max_age_days=SESSION_MAX_AGE_DAYS):
+        cutoff = datetime.datetime.now().timestamp() - max_age_days * 86400
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+# ---------- SHARED STORE ----------
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(backend=None):
+    """Return the process-wide session store for ``backend`` (default from the env).
+
+    Opening it drops sessions older than ``SESSION_MAX_AGE_DAYS``.
+    """
+    backend = backend or SESSION_BACKEND
+    with _stores_lock:
+        store = _stores.get(backend)
+        if store is None:
+            if backend == "sqlite":
+                store = SQLiteSessionStore(os.environ.get("ASD_SESSION_DB", "sessions.db"))
+            elif backend == "file":
+                store = FileSessionStore(os.environ.get("ASD_SESSION_DIR", "sessions"))
+            else:
+                raise ValueError(f"unknown session backend {backend!r}")
+            store.expire()
+            _stores[backend] = store
+        return store
@@ -0,0 +1,135 @@
+"""Train the ASD model on a CSV too large for memory.
+
+    python train_stream.py pooled_sites.csv --chunksize 200000 --epochs 2
+
+The file (same schema as train.csv) is read in chunks, twice or more:
+
+1. a first streaming pass counts every categorical value, the class balance
+   and keeps a fixed-size random sample of rows;
+2. the preprocessor is built with those full-data vocabularies and fitted
+   (imputer, scaler) on the sample;
+3. each epoch streams the file again, encoding one chunk at a time into a
+   sparse matrix and updating an ``SGDClassifier`` (logistic loss) with
+   ``partial_fit``.  Every 10th row is held out for a streaming accuracy.
+
+Memory is bounded by the chunk size plus the sample, not by the file size.
+The result is saved through model_service like any other model.
+"""
+
+import argparse
+import datetime
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from features import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, build_preprocessor, clean_frame, split_target
+from model_service import MODEL_DIR, MODEL_PATH, save_artifact
+
+HOLDOUT_EVERY = 10
+
+
+def _chunks(path, chunksize):
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+def scan(path, chunksize, sample_size=50_000, seed=0):
+    """First pass: category counts, class counts and a uniform row sample."""
+    rng = np.random.default_rng(seed)
+    counts = {col: Counter() for col in CATEGORICAL_COLUMNS}
+    classes = Counter()
+    sample, seen = None, 0
+    for chunk in _chunks(path, chunksize):
+        X, y = split_target(chunk)
+        for col in CATEGORICAL_COLUMNS:
+            counts[col].update(clean_frame(X[[col]])[col].value_counts().to_dict())
+        classes.update(y.value_counts().to_dict())
+        seen += len(X)
+        # Bottom-k on random keys: a uniform sample of the whole file that
+        # never holds more than sample_size + chunksize rows.
+        X = X[FEATURE_COLUMNS].assign(_key=rng.random(len(X)))
+        sample = X if sample is None else pd.concat([sample, X])
+        sample = sample.nsmallest(sample_size, "_key")
+    if sample is None:
+        raise ValueError(f"{path} has no rows")
+    return counts, classes, sample.drop(columns="_key"), seen
+
+
+def vocabularies(counts, min_frequency):
+    """Per-column category lists; values rarer than ``min_frequency`` are dropped."""
+    vocab = []
+    for col in CATEGORICAL_COLUMNS:
+        keep = {v for v, n in counts[col].items() if n >= min_frequency}
+        vocab.append(sorted(keep | {"missing"}))  # "missing" is the imputer's fill value
+    return vocab
+
+
+def train_streaming(path, chunksize=100_000, epochs=1, min_frequency=5,
+                    sample_size=50_000, model_path=MODEL_PATH, model_dir=MODEL_DIR):
+    """Stream-train a model on ``path`` and save it; return the artifact."""
+    counts, classes, sample, n_rows = scan(path, chunksize, sample_size)
+    if len(classes) < 2:
+        raise ValueError(f"need both classes to train, found only {sorted(classes)}")
+
+    prep = build_preprocessor(categories=vocabularies(counts, min_frequency), min_frequency=None)
+    prep.fit(sample)
+
+    # partial_fit can't use class_weight="balanced", so weight samples instead.
+    total = sum(classes.values())
+    weights = {c: total / (len(classes) * n) for c, n in classes.items()}
+
+    model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+    for _ in range(epochs):
+        correct = held_out = 0
+        row0 = 0
+        for chunk in _chunks(path, chunksize):
+            X, y = split_target(chunk)
+            holdout = (np.arange(row0, row0 + len(chunk)) % HOLDOUT_EVERY) == 0
+            row0 += len(chunk)
+
+            Xt = prep.transform(X)
+            y = y.to_numpy()
+            train = ~holdout
+            if train.any():
+                model.partial_fit(Xt[train], y[train], classes=np.array([0, 1]),
+                                  sample_weight=np.vectorize(weights.get)(y[train]))
+            if holdout.any() and hasattr(model, "coef_"):
+                correct += int((model.predict(Xt[holdout]) == y[holdout]).sum())
+                held_out += int(holdout.sum())
+
+    now = datetime.datetime.now()
+    artifact = {
+        "model": Pipeline([("prep", prep), ("model", model)]),
+        "version": now.strftime("%Y%m%d-%H%M%S"),
+        "trained_at": now.isoformat(timespec="seconds"),
+        "features": FEATURE_COLUMNS,
+        "n_rows": n_rows,
+        "accuracy": correct / held_out if held_out else float("nan"),
+        "training": {"mode": "streaming", "chunksize": chunksize, "epochs": epochs},
+    }
+    save_artifact(artifact, model_path, model_dir)
+    return artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chunked training on a large AQ-10 style CSV.")
+    parser.add_argument("csv", help="labelled CSV with the train.csv columns")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--min-frequency", type=int, default=5,
+                        help="drop category values seen fewer times than this")
+    parser.add_argument("--sample-size", type=int, default=50_000,
+                        help="rows sampled to fit the imputer and scaler")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    artifact = train_streaming(args.csv, args.chunksize, args.epochs, args.min_frequency,
+                               args.sample_size, args.model_path)
+    print(f"Model {artifact['version']}: {artifact['n_rows']} rows, "
+          f"held-out accuracy {artifact['accuracy']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,6 @@ Original file is located at
 
 
 import streamlit as st
-import pandas as pd
 
 # Title
 st.title("ASD Screening App")